@@ -1,9 +1,22 @@
 import imaplib
 import email
 from email.header import decode_header
+from email.parser import BytesHeaderParser
 import re
+import base64
+import binascii
+import quopri
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from credentials import EMAIL_USER, EMAIL_PASS, IMAP_SERVER
 
+# UIDs per UID FETCH command of the async reader
+FETCH_BATCH_SIZE = 100
+
+# Header patterns used by the single-part fast path
+CONTENT_TYPE_RE = re.compile(rb'^Content-Type:[ \t]*([^;\s]+)', re.IGNORECASE | re.MULTILINE)
+TRANSFER_ENCODING_RE = re.compile(rb'^Content-Transfer-Encoding:[ \t]*(\S+)', re.IGNORECASE | re.MULTILINE)
+
 
 # ========================================================== #
 # Email Utility Functions
@@ -18,6 +31,19 @@ def connect_to_mailbox():
     mail.login(EMAIL_USER, EMAIL_PASS)
     return mail
 
+async def connect_to_mailbox_async(mailbox="inbox"):
+    """
+    Connects to the IMAP email server with aioimaplib, logs in,
+    selects the mailbox and returns the async client.
+    """
+    import aioimaplib  # Only needed by the async reader
+
+    client = aioimaplib.IMAP4_SSL(IMAP_SERVER)
+    await client.wait_hello_from_server()
+    await client.login(EMAIL_USER, EMAIL_PASS)
+    await client.select(mailbox)
+    return client
+
 def decode_mime_words(s):
     """
     Decodes MIME-encoded email header strings (e.g., Subject).
@@ -61,6 +87,92 @@ def extract_links_from_body(body):
     """
     return re.findall(r'(https?://\S+)', body)
 
+def _split_raw_email(raw_email):
+    """
+    Splits a raw RFC822 email into its header block and body bytes.
+    """
+    headers, sep, body = raw_email.partition(b'\r\n\r\n')
+    if not sep:
+        headers, sep, body = raw_email.partition(b'\n\n')
+    return headers, body
+
+def _fast_text_body(raw_email):
+    """
+    Decodes the body of a single-part text/plain email straight from the
+    raw bytes with the C base64/quopri decoders, skipping the email parser.
+    Returns None when the email needs the full parser (multipart, HTML, ...).
+    """
+    headers, body = _split_raw_email(raw_email)
+    content_type = CONTENT_TYPE_RE.search(headers)
+    # A missing Content-Type defaults to text/plain (RFC 2045)
+    if content_type and content_type.group(1).lower() != b'text/plain':
+        return None
+
+    encoding = TRANSFER_ENCODING_RE.search(headers)
+    encoding = encoding.group(1).lower() if encoding else b'7bit'
+    if encoding == b'base64':
+        try:
+            return base64.b64decode(body)
+        except binascii.Error:
+            return None
+    if encoding == b'quoted-printable':
+        return quopri.decodestring(body)
+    return body
+
+def get_text_body(msg):
+    """
+    Returns the first plain text body of the email message,
+    or an empty string if there is none.
+    """
+    if msg.is_multipart():
+        # Walk through each part to find the plain text body
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            content_disposition = str(part.get("Content-Disposition"))
+
+            if content_type == "text/plain" and "attachment" not in content_disposition:
+                payload = part.get_payload(decode=True)
+                if payload:
+                    return safe_decode(payload)  # Stop at first found text/plain body
+    else:
+        # Single part email
+        if msg.get_content_type() == "text/plain":
+            payload = msg.get_payload(decode=True)
+            if payload:
+                return safe_decode(payload)
+    return ""
+
+def parse_email_links(raw_email):
+    """
+    Parses a raw RFC822 email and returns its subject, sender,
+    plain text body and the hyperlinks found in that body.
+    """
+    payload = _fast_text_body(raw_email)
+    if payload is None:
+        # Multipart or non-text email: fall back to the full parser
+        msg = email.message_from_bytes(raw_email)
+        body = get_text_body(msg)
+    else:
+        msg = BytesHeaderParser().parsebytes(_split_raw_email(raw_email)[0])
+        body = safe_decode(payload) if payload else ""
+    subject = decode_mime_words(msg["subject"])
+    from_ = msg.get("From")
+    links = extract_links_from_body(body) if body else []
+    return subject, from_, body, links
+
+def print_email_links(subject, from_, body, links):
+    """
+    Prints an email's subject, sender and the hyperlinks found in it.
+    """
+    print(f"\n📬 Email - Subject: {subject}, From: {from_}")
+    if body:
+        if links:
+            print("🔗 Links found:")
+            for link in links:
+                print(f" - {link}")
+        else:
+            print("🔗 No links found in this email.")
+
 # ========================================================== #
 # Core Functions
 # ========================================================== #
@@ -119,42 +231,39 @@ def read_email_body_and_extract_links():
         status, msg_data = mail.fetch(eid, "(RFC822)")
         for response_part in msg_data:
             if isinstance(response_part, tuple):
-                msg = email.message_from_bytes(response_part[1])
-                subject = decode_mime_words(msg["subject"])
-                from_ = msg.get("From")
-                print(f"\n📬 Email - Subject: {subject}, From: {from_}")
-
-                body = ""
-
-                if msg.is_multipart():
-                    # Walk through each part to find the plain text body
-                    for part in msg.walk():
-                        content_type = part.get_content_type()
-                        content_disposition = str(part.get("Content-Disposition"))
-
-                        if content_type == "text/plain" and "attachment" not in content_disposition:
-                            payload = part.get_payload(decode=True)
-                            if payload:
-                                body = safe_decode(payload)
-                                break  # Stop at first found text/plain body
-                else:
-                    # Single part email
-                    content_type = msg.get_content_type()
-                    if content_type == "text/plain":
-                        payload = msg.get_payload(decode=True)
-                        if payload:
-                            body = safe_decode(payload)
-
-                if body:
-                    links = extract_links_from_body(body)
-                    if links:
-                        print("🔗 Links found:")
-                        for link in links:
-                            print(f" - {link}")
-                    else:
-                        print("🔗 No links found in this email.")
+                print_email_links(*parse_email_links(response_part[1]))
 
     mail.logout()
+
+async def read_email_body_and_extract_links_async():
+    """
+    Async version of read_email_body_and_extract_links().
+    Downloads the emails with one UID FETCH per FETCH_BATCH_SIZE messages
+    and parses each batch in a thread pool while the next one downloads.
+    """
+    print("\n🟢 Fetching email bodies and extracting links (async)...")
+    client = await connect_to_mailbox_async()
+    status, lines = await client.uid_search("ALL")
+    uids = lines[0].split() if status == "OK" else []
+
+    loop = asyncio.get_running_loop()
+    parsing = []  # Parse jobs of the previous batch, still running
+    with ThreadPoolExecutor() as executor:
+        for start in range(0, len(uids), FETCH_BATCH_SIZE):
+            uid_set = b",".join(uids[start:start + FETCH_BATCH_SIZE]).decode()
+            status, lines = await client.uid("fetch", uid_set, "(RFC822)")
+            for parsed in await asyncio.gather(*parsing):
+                print_email_links(*parsed)
+            if status != "OK":
+                parsing = []
+                continue
+            # The message literals arrive as bytearrays, between the bytes lines of the FETCH response
+            parsing = [loop.run_in_executor(executor, parse_email_links, bytes(line))
+                       for line in lines if isinstance(line, bytearray)]
+        for parsed in await asyncio.gather(*parsing):
+            print_email_links(*parsed)
+
+    await client.logout()
     
 # --------------------------- #
 # Main Runner
@@ -165,5 +274,6 @@ if __name__ == "__main__":
         read_unread_emails()
         #read_emails_from_sender("jobalerts-noreply@linkedin.com")  # <-- Replace with actual sender
         #read_email_body_and_extract_links()
+        #asyncio.run(read_email_body_and_extract_links_async())
     except KeyboardInterrupt:
         print("\n👋 Program interrupted by user. Exiting gracefully...")
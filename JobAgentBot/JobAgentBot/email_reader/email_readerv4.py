@@ -15,7 +15,6 @@ Resume from where it left off automatically.
 
 """
 
-import imaplib
 import email
 from email.header import decode_header
 import logging
@@ -26,6 +25,7 @@ import sys
 import signal
 from datetime import datetime
 from credentials import EMAIL_USER, EMAIL_PASS, IMAP_SERVER
+from tuned_imap import TunedIMAP4_SSL
 
 # ----------------------------
 # Configuration Section
@@ -95,7 +95,7 @@ def connect_to_mailbox():
     Connects to the IMAP server and logs in.
     """
     try:
-        mail = imaplib.IMAP4_SSL(IMAP_SERVER)
+        mail = TunedIMAP4_SSL(IMAP_SERVER)
         mail.login(EMAIL_USER, EMAIL_PASS)
         logging.info("Successfully connected to mailbox.")
         return mail
@@ -194,6 +194,7 @@ def process_emails():
     last_processed_uid = load_checkpoint()
 
     processed_count = 0
+    max_uid = last_processed_uid  # Highest UID processed so far, persisted on each flush
 
     for uid in email_uids:
         uid_int = int(uid)
@@ -234,12 +235,13 @@ def process_emails():
                             all_links.extend(links)
 
                     processed_count += 1
-                    save_checkpoint(uid_int)  # Save after every email processed
+                    max_uid = max(max_uid, uid_int)
 
-                    # Save links periodically
+                    # Save links periodically, checkpointing together with each flush
                     if processed_count % 10 == 0 or should_exit:
                         save_links_to_csv(all_links)
                         all_links.clear()  # Clear already saved links
+                        save_checkpoint(max_uid)
 
                     # If user pressed Ctrl+C, exit cleanly
                     if should_exit:
@@ -249,6 +251,10 @@ def process_emails():
                     # Stop if batch size is reached
                     if processed_count >= BATCH_SIZE:
                         logging.info(f"Processed {processed_count} emails. Batch limit reached.")
+                        if all_links:
+                            save_links_to_csv(all_links)
+                            all_links.clear()
+                        save_checkpoint(max_uid)
                         return
 
                 except Exception as e:
@@ -257,6 +263,8 @@ def process_emails():
     # Final save if anything remains
     if all_links:
         save_links_to_csv(all_links)
+    if max_uid > last_processed_uid:
+        save_checkpoint(max_uid)
 
 # ----------------------------
 # Main Program Entry
@@ -1,6 +1,6 @@
 import os
 import sys
-from modules.email_reader.email_client import EmailClient
+from modules.email_reader.email_client import EmailClient, FULL_FETCH_ITEMS, HEADER_FETCH_ITEMS
 from modules.email_reader.email_processor import EmailProcessor
 from modules.email_organizer.config_manager import ConfigManager
 from modules.email_organizer.organizer import Organizer
@@ -42,7 +42,10 @@ def main():
             logger.error("Failed to connect to the email server. Exiting.")
             return
 
-        emails = email_client.fetch_emails(limit=100)
+        # Bodies are only downloaded when some rule has a condition on them
+        fields = organizer.rule_engine.condition_fields()
+        needs_body = fields is None or "body" in fields
+        emails = email_client.fetch_emails(limit=100, fetch_items=FULL_FETCH_ITEMS if needs_body else HEADER_FETCH_ITEMS)
         logger.info(f"Fetched {len(emails)} emails from {mailbox}")
 
         for email_data in emails:
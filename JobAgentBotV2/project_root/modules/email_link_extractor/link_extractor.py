@@ -1,27 +1,115 @@
 import re
-from bs4 import BeautifulSoup
+from bisect import bisect_right
+from html import unescape
+from itertools import accumulate
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import re2  # Optional: RE2 matches in linear time, without backtracking
+except ImportError:
+    re2 = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # Optional: C HTML parser, much faster than bs4
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html  # Optional: C HTML parser, used directly when selectolax is missing
+except ImportError:
+    lxml = None
+
+HTML_PARSER = "lxml" if lxml else "html.parser"  # For the BeautifulSoup fallback
+
+# Compiled once at import; extract_links_from_text() runs for every email
+URL_TEMPLATE = r'https?://[^{space}<>"]+|www\.[^{space}<>"]+'
+URL_PATTERN = URL_TEMPLATE.format(space=r'\s')
+# RE2's \s is ASCII only; these add the rest of what \s matches in a Python str pattern (NBSP, em space, ...)
+RE2_SPACE = r'\s\p{Z}\x0b\x1c-\x1f\x85'
+URL_RE2_PATTERN = URL_TEMPLATE.format(space=RE2_SPACE)
+URL_RE = re2.compile(URL_RE2_PATTERN) if re2 else re.compile(URL_PATTERN)
+
+# The same pattern for undecoded UTF-8 bodies. A bytes \s only covers ASCII whitespace, so a URL
+# byte is any byte but those, \x0b and \x1c-\x1f, and the UTF-8 encodings of the other characters
+# \s matches in str: U+0085 and U+00A0 (\xc2..), U+1680 (\xe1\x9a\x80), U+2000-U+200A, U+2028,
+# U+2029, U+202F and U+205F (\xe2\x80.., \xe2\x81\x9f), and U+3000 (\xe3\x80\x80).
+URL_BYTE = (rb'(?:[^\s\x0b\x1c-\x1f<>"\xc2\xe1\xe2\xe3]'
+            rb'|\xc2[^\x85\xa0]'
+            rb'|\xe1(?:[^\x9a]|\x9a[^\x80])'
+            rb'|\xe2(?:[^\x80\x81]|\x80[^\x80-\x8a\xa8\xa9\xaf]|\x81[^\x9f])'
+            rb'|\xe3(?:[^\x80]|\x80[^\x80]))')
+URL_BYTES_PATTERN = rb'https?://' + URL_BYTE + rb'+|www\.' + URL_BYTE + rb'+'
+if re2:
+    # RE2 reads even a bytes pattern as UTF-8 by default; Latin-1 makes each \xNN one byte
+    _byte_options = re2.Options()
+    _byte_options.encoding = re2.Options.Encoding.LATIN1
+    URL_BYTES_RE = re2.compile(URL_BYTES_PATTERN, _byte_options)
+else:
+    URL_BYTES_RE = re.compile(URL_BYTES_PATTERN)
+
+# One pass for extract_all_links(): an http(s) href value (group 1) or a bare URL (group 2).
+# An href is matched as a whole, so the URL inside it is not found a second time.
+ALL_LINKS_PATTERN = r"""href\s*=\s*["'](https?://[^"']+)["']|({url})"""
+ALL_LINKS_RE = (re2.compile(ALL_LINKS_PATTERN.format(url=URL_RE2_PATTERN)) if re2
+                else re.compile(ALL_LINKS_PATTERN.format(url=URL_PATTERN)))
+
+# Only <a href=...> elements are built into the tree; everything else is skipped while parsing
+ANCHORS_WITH_HREF = SoupStrainer("a", href=True)
 
 class LinkExtractor:
     @staticmethod
     def extract_links_from_text(text):
-        """Extract all URLs from plain text"""
-        url_pattern = re.compile(r'https?://[^\s<>"]+|www\.[^\s<>"]+')
-        return url_pattern.findall(text)
+        """Extract all unique URLs from plain text, in order of first appearance"""
+        # Substring checks are far cheaper than a regex scan, and most bodies have no links
+        if "http" not in text and "www." not in text:
+            return []
+        return list(dict.fromkeys(URL_RE.findall(text)))
+
+    @staticmethod
+    def extract_links_from_bytes(payload):
+        """Extract all unique URLs from a UTF-8 encoded body, decoding only the URLs found"""
+        if b"http" not in payload and b"www." not in payload:
+            return []
+        return list(dict.fromkeys(link.decode('utf-8', errors='ignore') for link in URL_BYTES_RE.findall(payload)))
+
+    @staticmethod
+    def extract_links_from_texts(texts):
+        """
+        Extract links from many texts with one regex scan over all of them.
+        Returns one list per text, the same as extract_links_from_text() would.
+        """
+        # Joined with a newline, which no URL can contain, so a match never spans two texts
+        starts = list(accumulate((len(text) + 1 for text in texts), initial=0))
+        links = [{} for _ in texts]
+        for match in URL_RE.finditer("\n".join(texts)):
+            links[bisect_right(starts, match.start()) - 1][match.group()] = None
+        return [list(text_links) for text_links in links]
 
     @staticmethod
     def extract_links_from_html(html_content):
-        """Extract all valid URLs from HTML content"""
+        """Extract all unique valid URLs from HTML content, in order of first appearance"""
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            links = [a['href'] for a in soup.find_all('a', href=True)]
-            return [link for link in links if link.startswith('http')]
+            if LexborHTMLParser:
+                # The selector drops '#', mailto: and other non-http hrefs while matching
+                anchors = LexborHTMLParser(html_content).css('a[href^="http"]')
+                return list(dict.fromkeys(a.attributes['href'] for a in anchors))
+            if lxml:
+                # iterlinks() walks the tree in C and also yields src/style/... links, so keep only <a href>
+                links = [link for element, attribute, link, _ in lxml.html.fromstring(html_content).iterlinks()
+                         if attribute == 'href' and element.tag == 'a']
+                return list(dict.fromkeys(link for link in links if link.startswith('http')))
+            soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=ANCHORS_WITH_HREF)
+            links = [a['href'] for a in soup.find_all('a')]
+            return list(dict.fromkeys(link for link in links if link.startswith('http')))
         except Exception:
             return []
 
     @staticmethod
     def extract_all_links(text, is_html=False):
-        """Extract links from either plain text or HTML"""
-        if is_html or ('<html' in text.lower() and '</html>' in text.lower()):
-            return LinkExtractor.extract_links_from_html(text)
-        else:
-            return LinkExtractor.extract_links_from_text(text)
\ No newline at end of file
+        """
+        Extract links from either plain text or HTML in a single regex pass:
+        http(s) href values of HTML tags and URLs written out in the text, each
+        once, in order of first appearance. is_html is kept for existing callers; it is no longer
+        needed to pick a parser.
+        """
+        return list(dict.fromkeys(unescape(href) if href else url for href, url in ALL_LINKS_RE.findall(text)))
\ No newline at end of file
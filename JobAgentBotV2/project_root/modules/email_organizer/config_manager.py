@@ -1,9 +1,26 @@
 import os
+import copy
 import json
+import tempfile
+from typing import Any
 from core.utils.logger_config import get_logger
 
+try:
+    import orjson  # Optional: faster JSON parsing and writing
+except ImportError:
+    orjson = None
+
 logger = get_logger(__name__)
 
+def _dump_json(data: Any) -> bytes:
+    """
+    Serializes the configuration for writing, with orjson when it is installed.
+    Both paths indent by 2 (the only width orjson offers), so the file looks the same either way.
+    """
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
 class ConfigManager:
     def __init__(self, config_path: str = "core/config/email_organizer_config.json"):
         """
@@ -14,7 +31,10 @@ class ConfigManager:
                 Defaults to "core/config/email_organizer_config.json".
         """
         self.config_path = config_path
+        self.config_dir = os.path.dirname(config_path) or "."  # Worked out once, used by every save
         self.default_config = {
+            "email_folder": "INBOX",
+            "processed_folder": "Processed",
             "rules": [
                 {
                     "name": "Example Rule",
@@ -23,8 +43,65 @@ class ConfigManager:
                 }
             ]
         }
+        self._config = None  # Loaded on first access and kept in memory
+        self._dirty = False  # True when set() changed something save_config() has not written yet
 
     def get_config(self) -> dict:
+        """
+        Returns the configuration, loading it from the file on first use.
+        If the file does not exist, it creates a new one with default settings.
+        Keys missing from the file take their default values.
+
+        Returns:
+            dict: The configuration data.
+        """
+        if self._config is None:
+            config = self._load_config()
+            # A copy of the defaults, so set() never modifies the shared ones
+            merged = copy.deepcopy(self.default_config)
+            if config is not self.default_config:
+                merged.update(config)
+            self._config = merged
+        return self._config
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns a single configuration value.
+        """
+        return self.get_config().get(key, default)
+
+    def set(self, key: str, value: Any):
+        """
+        Changes a configuration value in memory. Call save_config() to persist it.
+        """
+        self.get_config()[key] = value
+        self._dirty = True
+
+    def save_config(self):
+        """
+        Writes the configuration to the file if it changed since the last save.
+        The file is written to a temporary file first and then renamed over the
+        original, so readers never see a partially written config.
+        """
+        if not self._dirty:
+            return
+
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('wb', dir=self.config_dir, suffix=".tmp", delete=False) as f:
+                temp_path = f.name
+                f.write(_dump_json(self._config))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
+            self._dirty = False
+            logger.info(f"Successfully saved config to {self.config_path}")
+        except Exception as e:
+            logger.error(f"Failed to save config: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _load_config(self) -> dict:
         """
         Loads the configuration from the file. If the file does not exist,
         it creates a new one with default settings.
@@ -36,27 +113,27 @@ class ConfigManager:
             logger.warning(
                 f"Config file '{self.config_path}' not found. Creating new one with defaults.")
             # Ensure the directory exists before creating the file
-            config_dir = os.path.dirname(self.config_path)
-            if not os.path.exists(config_dir):
+            if not os.path.exists(self.config_dir):
                 try:
-                    os.makedirs(config_dir)  # Create the directory
-                    logger.info(f"Created directory: {config_dir}")
+                    os.makedirs(self.config_dir)  # Create the directory
+                    logger.info(f"Created directory: {self.config_dir}")
                 except OSError as e:
                     logger.error(f"Failed to create directory: {e}")
                     # If directory creation fails, return the default config and do not try to save.
                     return self.default_config
 
             try:
-                with open(self.config_path, 'w') as f:
-                    json.dump(self.default_config, f, indent=4)
+                with open(self.config_path, 'wb') as f:
+                    f.write(_dump_json(self.default_config))
                 logger.info(f"Successfully saved default config to {self.config_path}")
             except Exception as e:
                 logger.error(f"Failed to save config: {e}")
                 return self.default_config
 
         try:
-            with open(self.config_path, 'r') as f:
-                config_data = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                data = f.read()
+            config_data = orjson.loads(data) if orjson else json.loads(data)
             return config_data
         except Exception as e:
             logger.error(f"Error reading config file: {e}.  Returning default config.")
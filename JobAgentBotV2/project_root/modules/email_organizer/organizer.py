@@ -1,8 +1,11 @@
+import logging
 from typing import Dict, Any, List
 from .rule_engine import RuleEngine
 from core.utils.logger_config import get_logger
 
 logger = get_logger(__name__)
+# INFO logs below are guarded with logger.isEnabledFor(logging.INFO) (cached by
+# the logging module) so that at WARNING+ not even their arguments are built.
 
 class Organizer:
     def __init__(self, rules_json: Dict[str, Any], use_ml_model: bool = False, model: Any = None):
@@ -42,108 +45,120 @@ class Organizer:
 
         for item in actions_with_priority:
             if stop_processing:
-                logger.info(f"Stopping further action processing for email '{email_data.get('subject', '<No Subject>')}' due to 'stop_processing' action.")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Stopping further action processing for email '%s' due to 'stop_processing' action.", email_data.get('subject', '<No Subject>'))
                 break
 
             action = item['action']
             action_type = action.get("type")
 
-            if action_type in self.action_handlers:
-                handler = self.action_handlers[action_type]
+            handler = self.action_handlers.get(action_type)
+            if handler is not None:
                 success = handler(email_data, action)
                 if success:
                     applied_actions.append(action)
                 else:
-                    logger.error(f"Failed to apply action '{action_type}' on email '{email_data.get('subject', '<No Subject>')}'. Action details: {action}")
+                    logger.error("Failed to apply action '%s' on email '%s'. Action details: %s", action_type, email_data.get('subject', '<No Subject>'), action)
 
                 if action_type == "stop_processing":
                     stop_processing = True
             else:
-                logger.warning(f"Unknown action type '{action_type}' encountered for email '{email_data.get('subject', '<No Subject>')}'. Action details: {action}")
+                logger.warning("Unknown action type '%s' encountered for email '%s'. Action details: %s", action_type, email_data.get('subject', '<No Subject>'), action)
 
         return applied_actions
 
     def _move_to_folder(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         folder_name = action.get("target")
         if folder_name:
-            logger.info(f"Simulating move to folder '{folder_name}' for email '{email_data.get('subject', '<No Subject>')}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating move to folder '%s' for email '%s'", folder_name, email_data.get('subject', '<No Subject>'))
             return True # Simulate success
         else:
-            logger.error(f"'target' folder missing for 'move_to_folder' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'target' folder missing for 'move_to_folder' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _delete_email(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
-        logger.warning(f"Simulating deletion of email '{email_data.get('subject', '<No Subject>')}'")
+        logger.warning("Simulating deletion of email '%s'", email_data.get('subject', '<No Subject>'))
         return True # Simulate success
 
     def _add_category(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         category_name = action.get("category_name")
         if category_name:
-            logger.info(f"Simulating adding category '{category_name}' to email '{email_data.get('subject', '<No Subject>')}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating adding category '%s' to email '%s'", category_name, email_data.get('subject', '<No Subject>'))
             return True
         else:
-            logger.error(f"'category_name' missing for 'add_category' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'category_name' missing for 'add_category' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _add_flag(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         flag_type = action.get("flag_type")
         if flag_type:
-            logger.info(f"Simulating adding flag '{flag_type}' to email '{email_data.get('subject', '<No Subject>')}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating adding flag '%s' to email '%s'", flag_type, email_data.get('subject', '<No Subject>'))
             return True
         else:
-            logger.error(f"'flag_type' missing for 'add_flag' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'flag_type' missing for 'add_flag' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _remove_flag(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         flag_type = action.get("flag_type")
         if flag_type:
-            logger.info(f"Simulating removing flag '{flag_type}' from email '{email_data.get('subject', '<No Subject>')}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating removing flag '%s' from email '%s'", flag_type, email_data.get('subject', '<No Subject>'))
             return True
         else:
-            logger.error(f"'flag_type' missing for 'remove_flag' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'flag_type' missing for 'remove_flag' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _forward_to(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         target_email = action.get("target_email")
         if target_email:
-            logger.info(f"Simulating forwarding email '{email_data.get('subject', '<No Subject>')}' to '{target_email}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating forwarding email '%s' to '%s'", email_data.get('subject', '<No Subject>'), target_email)
             return True
         else:
-            logger.error(f"'target_email' missing for 'forward_to' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'target_email' missing for 'forward_to' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _reply_with_template(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         template_id = action.get("template_id")
         if template_id:
-            logger.info(f"Simulating replying to email '{email_data.get('subject', '<No Subject>')}' with template '{template_id}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating replying to email '%s' with template '%s'", email_data.get('subject', '<No Subject>'), template_id)
             return True
         else:
-            logger.error(f"'template_id' missing for 'reply_with_template' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'template_id' missing for 'reply_with_template' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _mark_as_read(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
-        logger.info(f"Simulating marking email '{email_data.get('subject', '<No Subject>')}' as read")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Simulating marking email '%s' as read", email_data.get('subject', '<No Subject>'))
         return True
 
     def _mark_as_unread(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
-        logger.info(f"Simulating marking email '{email_data.get('subject', '<No Subject>')}' as unread")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Simulating marking email '%s' as unread", email_data.get('subject', '<No Subject>'))
         return True
 
     def _set_importance(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
         level = action.get("level")
         if level:
-            logger.info(f"Simulating setting importance to '{level}' for email '{email_data.get('subject', '<No Subject>')}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Simulating setting importance to '%s' for email '%s'", level, email_data.get('subject', '<No Subject>'))
             return True
         else:
-            logger.error(f"'level' missing for 'set_importance' action on email '{email_data.get('subject', '<No Subject>')}'")
+            logger.error("'level' missing for 'set_importance' action on email '%s'", email_data.get('subject', '<No Subject>'))
             return False
 
     def _stop_processing(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
-        logger.info(f"Encountered 'stop_processing' action for email '{email_data.get('subject', '<No Subject>')}'")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Encountered 'stop_processing' action for email '%s'", email_data.get('subject', '<No Subject>'))
         return True # Indicate success, as the goal is to stop
 
     def _no_op(self, email_data: Dict[str, Any], action: Dict[str, Any]) -> bool:
-        logger.info(f"Performing no operation for email '{email_data.get('subject', '<No Subject>')}'")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Performing no operation for email '%s'", email_data.get('subject', '<No Subject>'))
         return True
 
     # Placeholder for real implementations of action handlers
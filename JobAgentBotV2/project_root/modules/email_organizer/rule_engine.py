@@ -1,11 +1,16 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Tuple, Iterable, Iterator, Optional, Set
+from contextlib import contextmanager
+import heapq
 import operator
 import re  # For regular expression matching
+import sys
 from core.utils.logger_config import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
+_entry_priority = operator.itemgetter(0)  # Sort key of a compiled (priority, ...) entry
+
 class RuleEngine:
     """
     A class responsible for evaluating email data against a set of refined rules
@@ -42,6 +47,167 @@ class RuleEngine:
             "in": lambda a, b: a.lower() in [item.lower() for item in b] if isinstance(b, list) and isinstance(a, str) else (a in b if isinstance(b, list) else False),
             "not_in": lambda a, b: a.lower() not in [item.lower() for item in b] if isinstance(b, list) and isinstance(a, str) else (a not in b if isinstance(b, list) else True)
         }
+        self._compiled_rules: Tuple[Tuple[int, Dict[str, Any], Callable[[Dict[str, Any]], bool], bool, Any], ...] = ()
+        self._compiled_from: Tuple[Dict[str, Any], ...] = ()
+        self._field_masks: Dict[str, int] = {}
+        self._unindexed_mask = 0
+        self.compile_rules()
+
+    def compile_rules(self):
+        """
+        Turns every rule into a (priority, action, predicate, stops, fields) entry,
+        sorted by priority, so that evaluate() only has to call each predicate
+        instead of re-reading conditions and looking up operators for every email.
+
+        evaluate() recompiles automatically when rules are added to or removed
+        from self.rules; call this method after editing a rule in place.
+        """
+        # Sorted once here and frozen, so evaluate() never sorts and threads can share it
+        self._compiled_rules = tuple(sorted(self._compile_entries(self.rules), key=_entry_priority))
+        # The rule dicts themselves, not their ids: holding them keeps an id from being reused
+        self._compiled_from = tuple(self.rules)
+        self._build_field_index()
+
+    def condition_fields(self) -> Optional[Set[str]]:
+        """
+        Returns the email fields the conditions of the loaded rules read, e.g. so
+        the caller can skip fetching message bodies when no rule looks at "body".
+        Returns None when that cannot be told, i.e. a rule has a free-text "condition".
+        """
+        if any("condition" in rule for rule in self.rules):
+            return None
+        return {condition.get("field") for rule in self.rules
+                for condition in rule.get("conditions", []) if condition.get("field")}
+
+    def _rules_changed(self) -> bool:
+        """
+        True when rules were added to, removed from or replaced in self.rules since the last compile.
+        """
+        rules = self.rules
+        return len(rules) != len(self._compiled_from) or any(
+            rule is not compiled for rule, compiled in zip(rules, self._compiled_from))
+
+    def _build_field_index(self):
+        """
+        Maps each field to a bitmask of the compiled rules that can only match
+        when that field is present in the email data (bit i is self._compiled_rules[i]).
+        Rules without conditions go into self._unindexed_mask and are always tried.
+        """
+        field_masks: Dict[str, int] = {}
+        unindexed_mask = 0
+        for index, entry in enumerate(self._compiled_rules):
+            fields = entry[4]
+            if fields is None:
+                unindexed_mask |= 1 << index
+                continue
+            for field in fields:
+                field_masks[field] = field_masks.get(field, 0) | 1 << index
+        self._field_masks = field_masks
+        self._unindexed_mask = unindexed_mask
+
+    @staticmethod
+    def _index_fields(rule: Dict[str, Any]) -> Any:
+        """
+        Returns the fields a rule is indexed under: one of them must be present for
+        the rule to match. None means the rule has no conditions and always matches.
+        """
+        conditions = rule.get("conditions", [])
+        if not conditions:
+            return None
+        fields = [condition.get("field") if condition.get("operation") else None for condition in conditions]
+        if rule.get("condition_logic", "AND").upper() == "OR":
+            return tuple({sys.intern(field) if isinstance(field, str) else field for field in fields if field})
+        if not all(fields):
+            return ()  # An AND rule with an incomplete condition can never match
+        # Every field of an AND rule must be present, so indexing under one is enough
+        return (sys.intern(fields[0]) if isinstance(fields[0], str) else fields[0],)
+
+    def _compile_entries(self, rules: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, Dict[str, Any], Callable[[Dict[str, Any]], bool], bool, Any]]:
+        """
+        Yields the compiled (priority, action, predicate, stops, fields) entry of each rule, in input order.
+        """
+        for rule in rules:
+            action = rule.get("action")
+            if not action:
+                continue  # A rule without an action can never contribute anything
+            action_type = action.get("type")
+            if isinstance(action_type, str) and sys.intern(action_type) is not action_type:
+                # Interned so the Organizer's handler lookup hits on identity; set on a copy,
+                # since the rule dicts belong to the caller
+                action_type = sys.intern(action_type)
+                action = {**action, "type": action_type}
+            stops = action_type == "stop_processing"
+            yield (rule.get("priority", 100), action, self._compile_rule(rule), stops, self._index_fields(rule))
+
+    @contextmanager
+    def temporary_rules(self, extra_rules: Iterable[Dict[str, Any]]) -> Iterator["RuleEngine"]:
+        """
+        Evaluates with extra_rules added to the loaded rules until the block exits.
+        Only extra_rules are compiled on entry, and they are merged into the
+        already sorted rules; the previous rules and compiled state are restored
+        on exit, without recompiling.
+
+        Args:
+            extra_rules (Iterable[Dict[str, Any]]): Rules to add for the duration of the block.
+        """
+        if self._rules_changed():
+            self.compile_rules()
+        saved = (self.rules, self._compiled_rules, self._compiled_from, self._field_masks, self._unindexed_mask)
+        extra_rules = list(extra_rules)
+        extra_entries = sorted(self._compile_entries(extra_rules), key=_entry_priority)
+        self.rules = self.rules + extra_rules
+        # Same order as a full re-sort: on equal priority the loaded rules stay first
+        self._compiled_rules = tuple(heapq.merge(self._compiled_rules, extra_entries, key=_entry_priority))
+        self._compiled_from = tuple(self.rules)
+        self._build_field_index()
+        try:
+            yield self
+        finally:
+            self.rules, self._compiled_rules, self._compiled_from, self._field_masks, self._unindexed_mask = saved
+
+    def _compile_rule(self, rule: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Builds a predicate equivalent to evaluate_rule() for a single rule.
+        """
+        conditions = tuple(self._compile_condition(rule, condition) for condition in rule.get("conditions", []))
+        logic = rule.get("condition_logic", "AND").upper()
+
+        if not conditions:
+            return lambda email_data: True
+
+        if logic == "OR":
+            return lambda email_data: any(condition(email_data) for condition in conditions)
+        if logic != "AND":
+            logger.warning(f"Unknown condition logic '{logic}' in rule '{rule.get('id')}'. Assuming AND.")
+        return lambda email_data: all(condition(email_data) for condition in conditions)
+
+    def _compile_condition(self, rule: Dict[str, Any], condition: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Binds a condition's field, operator and value into a single callable.
+        """
+        field = condition.get("field")
+        operation = condition.get("operation")
+        value = condition.get("value")
+
+        if not (field and operation):
+            return lambda email_data: False
+        if isinstance(field, str):
+            field = sys.intern(field)  # Email data keys are interned literals, so lookups compare by identity
+
+        op_func = self.operators.get(operation)
+        if op_func is None:
+            logger.warning(f"Unknown operation '{operation}' in rule '{rule.get('id')}'")
+            return lambda email_data: False
+
+        if operation == "matches_regex" and isinstance(value, str):
+            try:
+                pattern = re.compile(value)  # Compiled once instead of on every evaluate()
+            except re.error as e:
+                logger.warning(f"Invalid regex '{value}' in rule '{rule.get('id')}': {e}")
+                return lambda email_data: False
+            return lambda email_data: field in email_data and isinstance(email_data[field], str) and pattern.match(email_data[field]) is not None
+
+        return lambda email_data: field in email_data and op_func(email_data[field], value)
 
     def evaluate(self, email_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -57,25 +223,53 @@ class RuleEngine:
                                     "priority" and "action" for matching rules,
                                     ordered by priority.
         """
+        if self._rules_changed():
+            self.compile_rules()  # Rules were added or removed since the last compile
+
+        return self._match(email_data)
+
+    def evaluate_batch(self, emails: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Evaluates several emails against the loaded rules, checking only once
+        whether the rules need recompiling.
+
+        Args:
+            emails (Iterable[Dict[str, Any]]): The email attribute dictionaries to evaluate.
+
+        Returns:
+            List[List[Dict[str, Any]]]: The result of evaluate() for each email, in input order.
+        """
+        if self._rules_changed():
+            self.compile_rules()
+
+        match = self._match
+        return [match(email_data) for email_data in emails]
+
+    def _match(self, email_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Runs the compiled rules against one email; the caller makes sure they are current.
+        """
         matching_actions = []
-        stop_processing = False
-
-        for rule in sorted(self.rules, key=lambda r: r.get("priority", 100)):
-            if stop_processing:
-                break
-
-            if self.evaluate_rule(rule, email_data):  # Corrected method call
-                action = rule.get("action")
-                if action:
-                    matching_actions.append({
-                        "priority": rule.get("priority", 100),
-                        "action": action
-                    })
-                    if action.get("type") == "stop_processing":
-                        stop_processing = True
-
-        # Sort actions by priority (lower is higher)
-        matching_actions.sort(key=lambda item: item["priority"])
+        compiled_rules = self._compiled_rules
+
+        # Only rules indexed under a field present in the email can match
+        candidates = self._unindexed_mask
+        field_masks = self._field_masks
+        for field in email_data:
+            candidates |= field_masks.get(field, 0)
+
+        # Lowest set bit first keeps the compiled priority order (lower is higher)
+        while candidates:
+            lowest = candidates & -candidates
+            candidates ^= lowest
+            priority, action, predicate, stops, _ = compiled_rules[lowest.bit_length() - 1]
+            if predicate(email_data):
+                matching_actions.append({
+                    "priority": priority,
+                    "action": action
+                })
+                if stops:
+                    break  # Conditions of lower-priority rules are never evaluated
 
         return matching_actions  # Return the list of dictionaries
 
@@ -0,0 +1,10 @@
+__all__ = ["EmailReader"]
+
+
+def __getattr__(name):
+    # Imported on first use: email_reader pulls in config_loader (which sets up file logging
+    # at import) and the link extractor, which the package's other modules do not need
+    if name == "EmailReader":
+        from .email_reader import EmailReader
+        return EmailReader
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,39 +1,213 @@
 import imaplib
 import email
+import re
+import time
+import atexit
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from email.header import decode_header
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from email.message import Message
 from core.utils.logger_config import get_logger  # Import your logger
+from modules.email_reader.tuned_imap import TunedIMAP4_SSL
 
 logger = get_logger(__name__)
 
+FETCH_BATCH_SIZE = 100  # UIDs per UID FETCH command
+MAX_CONNECTIONS_PER_ACCOUNT = 3  # Most providers throttle or reject more parallel sessions
+# IMAP fetch items; BODY.PEEK leaves the \Seen flag untouched
+FULL_FETCH_ITEMS = "(BODY.PEEK[])"
+HEADER_FETCH_ITEMS = "(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM)])"  # The headers fetch_emails() returns
+UID_RE = re.compile(rb"UID (\d+)")
+# (server, user, mailbox, password digest): a session is only reused with the credentials that opened it
+PoolKey = Tuple[str, str, str, str]
+
+
+def iter_uids(buf: bytes) -> Iterator[bytes]:
+    """
+    Lazily yield the UIDs contained in a UID SEARCH response buffer.
+
+    Walks the space-separated buffer with bytes.find() so the full list of
+    UIDs is never materialized at once, unlike buf.split().
+    """
+    start = 0
+    n = len(buf)
+    while start < n:
+        sp = buf.find(b' ', start)
+        end = sp if sp != -1 else n
+        if end > start:  # Skip empty tokens caused by repeated spaces
+            yield buf[start:end]
+        start = end + 1
+
+
+@lru_cache(maxsize=1024)
+def _decode_header_cached(value: str) -> str:
+    """
+    Decode an email header value into a readable string. Shared by all
+    EmailClient instances through EmailClient._decode_header.
+    """
+    if not value:
+        return ""
+    try:
+        parts = decode_header(value)  # Decode the header into parts
+        decoded = ""
+        for part, encoding in parts:
+            if isinstance(part, bytes):
+                # Decode bytes using the specified encoding
+                if encoding:
+                    try:
+                        decoded += part.decode(encoding, errors="ignore")
+                    except LookupError:
+                        # Handle unknown encoding
+                        decoded += part.decode("latin-1", errors="ignore")
+                else:
+                    decoded += part.decode("latin-1", errors="ignore")
+            else:
+                decoded += part  # Append plain string parts
+        return decoded  # Return the fully decoded header
+    except Exception as e:
+        logger.error(f"Error decoding header: {e}. Returning raw value.")
+        return value
+
+
+class EmailClientPool:
+    """
+    Keeps authenticated IMAP connections alive between EmailClient sessions so
+    that TLS setup, LOGIN and SELECT are paid once per (server, user, mailbox,
+    password) instead of on every connect(). Connections idle for longer than
+    idle_timeout seconds are logged out by a background timer.
+    """
+
+    def __init__(self, idle_timeout: float = 300):
+        self.idle_timeout = idle_timeout
+        self._connections: Dict[PoolKey, Tuple[imaplib.IMAP4, float]] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def acquire(self, key: PoolKey) -> Optional[imaplib.IMAP4]:
+        """
+        Take the pooled connection for key out of the pool.
+        Returns None if there is none or it no longer answers a NOOP.
+        """
+        with self._lock:
+            entry = self._connections.pop(key, None)
+        if entry is None:
+            return None
+
+        connection, _ = entry
+        try:
+            connection.noop()  # Make sure the server has not dropped the session
+            return connection
+        except (imaplib.IMAP4.error, OSError) as e:
+            logger.info(f"Discarding stale pooled connection for {key[1]}: {e}")
+            self._logout(connection)
+            return None
+
+    def release(self, key: PoolKey, connection: imaplib.IMAP4):
+        """
+        Return a connection to the pool for reuse.
+        """
+        with self._lock:
+            previous = self._connections.get(key)
+            self._connections[key] = (connection, time.monotonic())
+            self._schedule_eviction()
+        if previous is not None and previous[0] is not connection:
+            self._logout(previous[0])  # Only one idle connection is kept per key
+
+    def evict_idle(self):
+        """
+        Log out of every connection that has been idle longer than idle_timeout.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._timer = None
+            expired = [key for key, (_, last_used) in self._connections.items()
+                       if now - last_used >= self.idle_timeout]
+            evicted = [self._connections.pop(key)[0] for key in expired]
+            if self._connections:
+                self._schedule_eviction()
+        for connection in evicted:
+            self._logout(connection)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle IMAP connection(s).")
+
+    def close_all(self):
+        """
+        Log out of every pooled connection and stop the eviction timer.
+        """
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            connections = [connection for connection, _ in self._connections.values()]
+            self._connections.clear()
+        for connection in connections:
+            self._logout(connection)
+
+    def _schedule_eviction(self):
+        """
+        Start the eviction timer if it is not already running. Caller holds the lock.
+        """
+        if self._timer is None:
+            self._timer = threading.Timer(self.idle_timeout, self.evict_idle)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @staticmethod
+    def _logout(connection: imaplib.IMAP4):
+        try:
+            connection.logout()
+        except Exception as e:
+            logger.error(f"Error logging out pooled connection: {e}")
+
+
+# Shared by every EmailClient unless a different pool (or None) is passed in
+connection_pool = EmailClientPool()
+atexit.register(connection_pool.close_all)
+
+
 class EmailClient:
-    def __init__(self, imap_server: str, email_user: str, email_pass: str, mailbox: str = "INBOX"):
+    def __init__(self, imap_server: str, email_user: str, email_pass: str, mailbox: str = "INBOX",
+                 pool: Optional[EmailClientPool] = connection_pool):
         """
         Initialize the EmailClient with server details and credentials.
+        Pass pool=None to open and log out of a fresh connection every session.
         """
         self.imap_server = imap_server
         self.email_user = email_user
         self.email_pass = email_pass
         self.mailbox = mailbox
+        self.pool = pool
         self.connection = None  # Will hold the IMAP connection object
         self.is_connected = False
 
+    @property
+    def pool_key(self) -> PoolKey:
+        password_digest = hashlib.sha256(self.email_pass.encode("utf-8")).hexdigest()
+        return (self.imap_server, self.email_user, self.mailbox, password_digest)
+
     def connect(self) -> bool:
         """
         Connect to the IMAP server and log in with the provided credentials.
         Select the specified mailbox (default is "INBOX").
         Returns True on success, False on failure.
         """
+        if self.pool is not None:
+            connection = self.pool.acquire(self.pool_key)
+            if connection is not None:
+                logger.info(f"Reusing pooled connection to mailbox: {self.mailbox}")
+                self.connection = connection
+                self.is_connected = True
+                return True
+
         try:
             logger.info(
                 f"Connecting to IMAP server: {self.imap_server}:{993 if self.imap_server == 'imap.gmail.com' else 143} and mailbox: {self.mailbox}")
-            self.connection = imaplib.IMAP4_SSL(
-                self.imap_server)  # Establish a secure connection
-            self.connection.login(
-                self.email_user, self.email_pass)  # Log in to the email account
-            self.connection.select(
-                self.mailbox)  # Select the mailbox (e.g., "INBOX")
+            self.connection = self._open_connection()
             logger.info(f"Successfully connected to mailbox: {self.mailbox}")
             self.is_connected = True
             return True  # Indicate success
@@ -48,12 +222,30 @@ class EmailClient:
             self.is_connected = False
             return False  # Indicate failure
 
+    def _open_connection(self) -> imaplib.IMAP4:
+        """
+        Open a new IMAP session, log in and select the mailbox.
+        """
+        connection = TunedIMAP4_SSL(
+            self.imap_server)  # Establish a secure connection
+        connection.login(
+            self.email_user, self.email_pass)  # Log in to the email account
+        connection.select(
+            self.mailbox)  # Select the mailbox (e.g., "INBOX")
+        return connection
+
     def disconnect(self):
         """
         Disconnect from the IMAP server.
-        Close the selected mailbox and log out of the email account.
+        Close the selected mailbox and log out of the email account, or hand
+        the connection back to the pool when pooling is enabled.
         """
-        if self.connection:
+        if self.connection and self.pool is not None:
+            self.pool.release(self.pool_key, self.connection)
+            logger.info("Returned IMAP connection to the pool.")
+            self.connection = None
+            self.is_connected = False
+        elif self.connection:
             try:
                 self.connection.close()  # Close the selected mailbox
                 self.connection.logout()  # Log out of the IMAP server
@@ -66,12 +258,19 @@ class EmailClient:
                 self.connection = None
                 self.is_connected = False
 
-    def fetch_emails(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def fetch_emails(self, limit: int = 50, search: str = "ALL", concurrency: int = 1,
+                     fetch_items: str = FULL_FETCH_ITEMS) -> List[Dict[str, Any]]:
         """
         Fetch the latest emails from the mailbox.
 
         Args:
             limit (int): The maximum number of emails to fetch (default is 50).
+            search (str): IMAP search criteria evaluated by the server (default is "ALL").
+            concurrency (int): Number of IMAP sessions to fetch over in parallel
+                (default is 1, capped at MAX_CONNECTIONS_PER_ACCOUNT).
+            fetch_items (str): IMAP fetch items (default is the full message). Pass
+                HEADER_FETCH_ITEMS when only headers are needed; "body" is then empty
+                and fetch_body() can load it for individual emails.
 
         Returns:
             List[Dict[str, Any]]: A list of dictionaries containing email details (UID, subject, sender, body).
@@ -84,28 +283,25 @@ class EmailClient:
         try:
             # Use UID-based search for reliability
             typ, data = self.connection.uid(
-                'search', None, "ALL")  # Search for all emails in the mailbox
+                'search', None, search)  # Let the server filter the mailbox
             if typ != "OK":
                 logger.error("Failed to search for emails.")
                 return emails
 
-            uids = data[0].split()  # Get the list of email UIDs
-            if not uids:
+            # Keep only the latest UIDs while streaming through the search result
+            latest_uids = deque(iter_uids(data[0] or b""), maxlen=limit)
+            if not latest_uids:
                 logger.info("No emails found in the mailbox.")
                 return emails
 
-            latest_uids = uids[-limit:]  # Get the latest emails based on the limit
+            concurrency = min(concurrency, MAX_CONNECTIONS_PER_ACCOUNT, len(latest_uids))
+            if concurrency > 1:
+                raw_emails = self._fetch_raw_emails_parallel(list(latest_uids), concurrency, fetch_items)
+            else:
+                raw_emails = self._fetch_raw_emails(latest_uids, fetch_items=fetch_items)
 
-            for uid in latest_uids:
+            for uid, raw_email in raw_emails:
                 try:
-                    # Fetch the full email message using its UID
-                    typ, msg_data = self.connection.uid('fetch', uid, "(RFC822)")
-                    if typ != "OK":
-                        logger.warning(
-                            f"Failed to fetch email with UID {uid.decode()}. Skipping.")
-                        continue  # Skip if fetching the email fails
-
-                    raw_email = msg_data[0][1]  # Get the raw email content
                     msg = email.message_from_bytes(
                         raw_email)  # Parse the raw email into a Message object
 
@@ -154,24 +350,14 @@ class EmailClient:
                 logger.error("Failed to search for unread emails.")
                 return emails
 
-            uids = data[0].split()  # Get the list of email UIDs
-            if not uids:
+            # Keep only the latest UIDs while streaming through the search result
+            latest_uids = deque(iter_uids(data[0] or b""), maxlen=limit)
+            if not latest_uids:
                 logger.info("No unread emails found in the mailbox.")
                 return emails
 
-            latest_uids = uids[-limit:] if len(
-                uids) > limit else uids  # Get the latest emails based on the limit
-
-            for uid in latest_uids:
+            for uid, raw_email in self._fetch_raw_emails(latest_uids):
                 try:
-                    # Fetch the full email message using its UID
-                    typ, msg_data = self.connection.uid('fetch', uid, "(RFC822)")
-                    if typ != "OK":
-                        logger.warning(
-                            f"Failed to fetch email with UID {uid.decode()}. Skipping.")
-                        continue  # Skip if fetching the email fails
-
-                    raw_email = msg_data[0][1]  # Get the raw email content
                     msg = email.message_from_bytes(
                         raw_email)  # Parse the raw email into a Message object
 
@@ -198,45 +384,122 @@ class EmailClient:
                 f"An unexpected error occurred during unread email fetching: {e}")
             return emails
 
-    def _decode_header(self, value: str) -> str:
+    def fetch_body(self, uid: str) -> str:
         """
-        Decode email headers into a readable string.
+        Fetch the plain text body of a single email, e.g. after fetch_emails()
+        was called with HEADER_FETCH_ITEMS.
+
+        Args:
+            uid (str): The UID of the email.
+
+        Returns:
+            str: The plain text body, or an empty string if it could not be fetched.
         """
-        if not value:
+        if not self.is_connected:
+            logger.error("Not connected to IMAP server. Cannot fetch email body.")
             return ""
+
         try:
-            parts = decode_header(value)  # Decode the header into parts
-            decoded = ""
-            for part, encoding in parts:
-                if isinstance(part, bytes):
-                    # Decode bytes using the specified encoding
-                    if encoding:
-                        try:
-                            decoded += part.decode(encoding, errors="ignore")
-                        except LookupError:
-                            # Handle unknown encoding
-                            decoded += part.decode("latin-1", errors="ignore")
-                    else:
-                        decoded += part.decode("latin-1", errors="ignore")
-                else:
-                    decoded += part  # Append plain string parts
-            return decoded  # Return the fully decoded header
+            for _, raw_email in self._fetch_raw_emails([uid.encode()]):
+                return self._get_body(email.message_from_bytes(raw_email))
+            return ""
         except Exception as e:
-            logger.error(f"Error decoding header: {e}. Returning raw value.")
-            return value
+            logger.error(f"Error fetching body of email with UID {uid}: {e}")
+            return ""
+
+    def _fetch_raw_emails_parallel(self, uids: List[bytes], concurrency: int,
+                                   fetch_items: str = FULL_FETCH_ITEMS) -> List[tuple]:
+        """
+        Split the UIDs into contiguous chunks and fetch each chunk over its own
+        IMAP session in a thread. The first chunk reuses the current connection.
+
+        Returns:
+            List[tuple]: (uid, raw_email) pairs in the same order as uids.
+        """
+        chunk_size = -(-len(uids) // concurrency)  # Ceiling division
+        chunks = [uids[i:i + chunk_size] for i in range(0, len(uids), chunk_size)]
+
+        def fetch_chunk(index: int, chunk: List[bytes]) -> List[tuple]:
+            connection = None
+            try:
+                if index > 0:
+                    connection = self._open_connection()
+                return list(self._fetch_raw_emails(chunk, connection, fetch_items))
+            except Exception as e:
+                logger.error(
+                    f"Error fetching emails with UIDs {chunk[0].decode()}-{chunk[-1].decode()}: {e}")
+                return []
+            finally:
+                if connection is not None:
+                    try:
+                        connection.logout()
+                    except Exception as e:
+                        logger.error(f"Error logging out of parallel fetch connection: {e}")
+
+        logger.info(f"Fetching {len(uids)} emails over {len(chunks)} connections.")
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            results = executor.map(fetch_chunk, range(len(chunks)), chunks)
+            return [item for chunk_result in results for item in chunk_result]
+
+    def _fetch_raw_emails(self, uids, connection: Optional[imaplib.IMAP4] = None,
+                          fetch_items: str = FULL_FETCH_ITEMS) -> Iterator[tuple]:
+        """
+        Fetch the raw content of the given UIDs, FETCH_BATCH_SIZE UIDs per
+        UID FETCH command instead of one round-trip per message.
+        Uses self.connection unless another connection is given.
+
+        Yields:
+            tuple: (uid, raw_email) pairs, with the UID as bytes.
+        """
+        connection = connection or self.connection
+        uid_iter = iter(uids)
+        while batch := list(islice(uid_iter, FETCH_BATCH_SIZE)):
+            typ, msg_data = connection.uid('fetch', b",".join(batch).decode(), fetch_items)
+            if typ != "OK":
+                logger.warning(
+                    f"Failed to fetch emails with UIDs {batch[0].decode()}-{batch[-1].decode()}. Skipping.")
+                continue  # Skip the batch if fetching fails
+
+            # Responses alternate between (envelope, raw_email) tuples and b")" terminators
+            messages = [item for item in msg_data if isinstance(item, tuple)]
+            for position, (envelope, raw_email) in enumerate(messages):
+                match = UID_RE.search(envelope)
+                if match:
+                    uid = match.group(1)
+                elif position < len(batch):
+                    uid = batch[position]  # Server did not echo the UID; rely on request order
+                else:
+                    continue
+                yield uid, raw_email
+
+    def _decode_header(self, value: str) -> str:
+        """
+        Decode email headers into a readable string.
+        Results are cached, as the same From/Subject values repeat across a mailbox.
+        """
+        if not isinstance(value, str):
+            # email.header.Header objects (raw 8-bit headers) are not hashable
+            return _decode_header_cached.__wrapped__(value)
+        return _decode_header_cached(value)
+
     def _get_body(self, msg: Message) -> str:
         """
         Extract the plain text body content from an email message.
+        The result is stored on the message, so later calls skip the MIME walk.
         """
+        cached = getattr(msg, "_plain_body", None)
+        if cached is not None:
+            return cached
+
         body = ""
         try:
             if msg.is_multipart():  # Check if the email has multiple parts
                 for part in msg.walk():  # Iterate through each part
-                    content_type = part.get_content_type()
-                    disposition = str(part.get("Content-Disposition"))
+                    if part.get_content_type() != "text/plain":
+                        continue  # Only the Content-Disposition of text parts matters
 
                     # Prefer plain text if available and not an attachment
-                    if content_type == "text/plain" and "attachment" not in disposition:
+                    if "attachment" not in str(part.get("Content-Disposition")):
                         payload = part.get_payload(decode=True)
                         if payload:
                             try:
@@ -255,6 +518,7 @@ class EmailClient:
                         logger.error(
                             f"Error decoding non-multipart payload: {e}.  Returning empty body")
                         body = ""
+            msg._plain_body = body
             return body  # Return the plain text body
         except Exception as e:
             logger.error(
@@ -1,5 +1,131 @@
+import re
+from bisect import bisect_right
 from email.message import Message
-from typing import Optional, List
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import hyperscan  # Optional: SIMD keyword matching
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick  # pyahocorasick, optional
+except ImportError:
+    ahocorasick = None
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """
+    Build a regex alternation from a trie of the keywords, so shared prefixes
+    are matched once (e.g. "import", "important" -> "import").
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True  # End-of-keyword marker
+
+    def build(node) -> str:
+        if "" in node:
+            return ""  # A shorter keyword ends here, longer ones can't change the outcome
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive "does the text contain any of these keywords" check.
+    Scans with a Hyperscan database when hyperscan is installed, else with a
+    single Aho-Corasick pass when pyahocorasick is installed, and with a
+    single compiled trie regex otherwise.
+
+    The Hyperscan scratch space is per matcher, so a matcher must not be
+    used from several threads at once.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self._hs_db = None
+        self._hs_scratch = None
+        self._automaton = None
+        self._regex = None
+        # An empty keyword matches everything, which Hyperscan and the automaton can't express
+        if hyperscan is not None and self.keywords and all(self.keywords):
+            self._hs_db = hyperscan.Database()
+            self._hs_db.compile(expressions=[re.escape(keyword).encode("utf-8") for keyword in self.keywords])
+            self._hs_scratch = hyperscan.Scratch(self._hs_db)
+        elif ahocorasick is not None and self.keywords and all(self.keywords):
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        elif self.keywords:
+            self._regex = re.compile(_trie_pattern(self.keywords))
+
+    def matches(self, text: str) -> bool:
+        """Return True if text (already lowercased) contains any keyword."""
+        if self._hs_db is not None:
+            return self.matches_each([text])[0]
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        if self._regex is not None:
+            return self._regex.search(text) is not None
+        return False
+
+    def matches_each(self, texts: List[str]) -> List[bool]:
+        """
+        Same as [self.matches(text) for text in texts], but scans all texts
+        joined together in one pass of the automaton or regex.
+        """
+        results = [False] * len(texts)
+        if not texts or (self._hs_db is None and self._automaton is None and self._regex is None):
+            return results
+
+        if self._hs_db is not None:
+            encoded = [text.encode("utf-8") for text in texts]
+            byte_starts = []
+            offset = 0
+            for data in encoded:
+                byte_starts.append(offset)
+                offset += len(data) + 1
+
+            def on_match(pattern_id, start, end, flags, context):
+                # end is exclusive; the match's last byte belongs to exactly one text
+                results[bisect_right(byte_starts, end - 1) - 1] = True
+
+            self._hs_db.scan(b"\0".join(encoded), match_event_handler=on_match, scratch=self._hs_scratch)
+            return results
+
+        # Keywords never contain NUL, so no match can span two texts
+        joined = "\0".join(texts)
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+
+        if self._automaton is not None:
+            for end, keyword in self._automaton.iter(joined):
+                results[bisect_right(starts, end - len(keyword) + 1) - 1] = True
+            return results
+
+        search = self._regex.search
+        pos = 0
+        while (match := search(joined, pos)) is not None:
+            index = bisect_right(starts, match.start()) - 1
+            results[index] = True
+            if index + 1 == len(starts):
+                break
+            pos = starts[index + 1]  # Skip the rest of a text that already matched
+        return results
+
+
+# Attachment size estimates this close to max_attachment_size (as a fraction) are decoded exactly
+ATTACHMENT_SIZE_MARGIN = 0.05
+
 
 class EmailFilter:
     def __init__(
@@ -14,47 +140,185 @@ class EmailFilter:
         self.max_attachment_size = max_attachment_size
         self.importance_levels = importance_levels or []
 
-    def filter_email(self, msg: Message) -> bool:
-        subject = msg.get('Subject', '').lower()
-        sender = msg.get('From', '').lower()
-        importance = msg.get('Importance', '').lower()
-        priority = msg.get('X-Priority', '').lower()
+    @property
+    def subject_keywords(self) -> List[str]:
+        return self._subject_keywords
+
+    @subject_keywords.setter
+    def subject_keywords(self, keywords: List[str]):
+        self._subject_keywords = keywords
+        self._subject_matcher = KeywordMatcher(keywords)
+
+    @property
+    def sender_keywords(self) -> List[str]:
+        return self._sender_keywords
+
+    @sender_keywords.setter
+    def sender_keywords(self, keywords: List[str]):
+        self._sender_keywords = keywords
+        self._sender_matcher = KeywordMatcher(keywords)
+
+    def filter_email(self, msg: Union[Message, Dict[str, Any]]) -> bool:
+        """
+        Check a single email against the filter. Accepts either a Message or
+        a plain dict as produced by to_filter_dict() (or EmailClient, whose
+        dicts carry "subject" and "from"), which skips the email.message
+        machinery entirely.
+        """
+        subject, sender = self._subject_and_sender(msg)
 
         # If subject_keywords were given, check subject match
         if self.subject_keywords:
-            if not any(keyword.lower() in subject for keyword in self.subject_keywords):
+            if not self._subject_matcher.matches(subject):
                 return False
 
         # If sender_keywords were given, check sender match
         if self.sender_keywords:
-            if not any(keyword.lower() in sender for keyword in self.sender_keywords):
+            if not self._sender_matcher.matches(sender):
                 return False
 
+        return self._check_importance_and_attachments(msg)
+
+    def filter_batch(self, messages: List[Union[Message, Dict[str, Any]]]) -> List[bool]:
+        """
+        Apply filter_email() to many messages at once. The subject and sender
+        keyword checks run as one scan over all headers instead of one per
+        message; the remaining checks only run for messages that still match.
+
+        Returns:
+            List[bool]: One result per message, in the same order.
+        """
+        fields = [self._subject_and_sender(msg) for msg in messages]
+        results = [True] * len(messages)
+        if self.subject_keywords:
+            results = self._subject_matcher.matches_each([subject for subject, _ in fields])
+        if self.sender_keywords:
+            senders = [sender for _, sender in fields]
+            results = [a and b for a, b in zip(results, self._sender_matcher.matches_each(senders))]
+
+        return [matched and self._check_importance_and_attachments(msg)
+                for matched, msg in zip(results, messages)]
+
+    def to_filter_dict(self, msg: Message) -> Dict[str, Any]:
+        """
+        Extract everything filter_email() looks at from a Message into a
+        plain dict, so it can be filtered (repeatedly) without touching the
+        Message again.
+        """
+        data = {
+            "subject": msg.get('Subject', ''),
+            "from": msg.get('From', ''),
+            "importance": msg.get('Importance', ''),
+            "x_priority": msg.get('X-Priority', ''),
+        }
+        if self.max_attachment_size is not None:
+            data["attachments_size"] = self._total_attachment_size(msg)
+        return data
+
+    @staticmethod
+    def _subject_and_sender(msg: Union[Message, Dict[str, Any]]) -> Tuple[str, str]:
+        """Lowercased subject and sender of a Message or filter dict."""
+        if isinstance(msg, dict):
+            return (msg.get("subject") or "").lower(), (msg.get("from") or "").lower()
+        return msg.get('Subject', '').lower(), msg.get('From', '').lower()
+
+    def _check_importance_and_attachments(self, msg: Union[Message, Dict[str, Any]]) -> bool:
+        """Checks of filter_email() that don't depend on keywords."""
+        is_dict = isinstance(msg, dict)
+
         # If importance_levels were given, check importance match
         if self.importance_levels:
+            if is_dict:
+                importance = (msg.get("importance") or "").lower()
+                priority = (msg.get("x_priority") or "").lower()
+            else:
+                importance = msg.get('Importance', '').lower()
+                priority = msg.get('X-Priority', '').lower()
             if not (importance in self.importance_levels or priority.startswith('1')):
                 return False
 
         # If max_attachment_size was given, check attachments
         if self.max_attachment_size is not None:
-            total_attachment_size = 0
-            for part in msg.iter_attachments():
-                payload = part.get_payload(decode=True)
-                if payload:
-                    total_attachment_size += len(payload)
-            
+            if is_dict:
+                total_attachment_size = msg.get("attachments_size") or 0
+            else:
+                total_attachment_size = self._total_attachment_size(msg)
+
             if total_attachment_size > self.max_attachment_size:
                 return False
 
         # If passed all provided checks
         return True
 
+    def _total_attachment_size(self, msg: Message) -> int:
+        """
+        Total attachment size as compared against max_attachment_size: estimated,
+        unless the estimate is too close to the limit to call.
+        """
+        attachments = list(msg.iter_attachments())
+        total_attachment_size = sum(self._attachment_size(part) for part in attachments)
+
+        # Estimates are only decoded exactly when too close to the limit to call
+        margin = self.max_attachment_size * ATTACHMENT_SIZE_MARGIN
+        if abs(total_attachment_size - self.max_attachment_size) <= margin:
+            total_attachment_size = sum(self._attachment_size(part, exact=True) for part in attachments)
+        return total_attachment_size
+
+    def to_imap_search(self) -> str:
+        """
+        Build an IMAP SEARCH string equivalent to the subject, sender and
+        importance checks so the server only returns candidate emails.
+        Attachment size cannot be expressed server-side and is still checked
+        by filter_email().
+
+        imaplib sends commands as ASCII, so a keyword group containing
+        non-ASCII text is left out; the groups are ANDed, so the search only
+        gets broader, and filter_email() still applies that group locally.
+        """
+        criteria = []
+        if self.subject_keywords and all(k.isascii() for k in self.subject_keywords):
+            criteria.append(self._imap_or([f'SUBJECT {self._imap_quote(k)}' for k in self.subject_keywords]))
+        if self.sender_keywords and all(k.isascii() for k in self.sender_keywords):
+            criteria.append(self._imap_or([f'FROM {self._imap_quote(k)}' for k in self.sender_keywords]))
+        if self.importance_levels and all(level.isascii() for level in self.importance_levels):
+            levels = [f'HEADER Importance {self._imap_quote(level)}' for level in self.importance_levels]
+            levels.append('HEADER X-Priority "1"')
+            criteria.append(self._imap_or(levels))
+        return " ".join(criteria) if criteria else "ALL"
+
+    @staticmethod
+    def _imap_or(criteria: List[str]) -> str:
+        """Combine criteria with IMAP's binary OR operator, nesting as needed."""
+        if len(criteria) == 1:
+            return criteria[0]
+        return "(" + "OR " * (len(criteria) - 1) + " ".join(criteria) + ")"
+
+    @staticmethod
+    def _imap_quote(value: str) -> str:
+        """Quote a value as an IMAP string literal."""
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    @staticmethod
+    def _attachment_size(part: Message, exact: bool = False) -> int:
+        """
+        Size of an attachment once decoded. Base64 parts are estimated from the
+        encoded length (3 bytes per 4 characters) instead of being decoded,
+        unless exact is True.
+        """
+        payload = part.get_payload()
+        if not exact and isinstance(payload, str):
+            encoding = part.get('Content-Transfer-Encoding', '').strip().lower()
+            if encoding == 'base64':
+                return len(payload) * 3 // 4
+            if encoding in ('', '7bit', '8bit', 'binary'):
+                return len(payload)  # Not encoded, so already the decoded size
+        decoded = part.get_payload(decode=True)
+        return len(decoded) if decoded else 0
+
     def _get_total_attachment_size(self, msg: Message) -> int:
         """Calculate the total size of all attachments in the email."""
         total_size = 0
         for part in msg.walk():
             if part.get_content_disposition() == 'attachment':
-                payload = part.get_payload(decode=True)
-                if payload:  # Ensure payload is not None
-                    total_size += len(payload)
+                total_size += self._attachment_size(part, exact=True)
         return total_size
\ No newline at end of file
@@ -37,21 +37,27 @@ class EmailProcessor:
             # Connect to the email server
             self.client.connect()
 
-            # Fetch emails
-            emails = self.client.fetch_emails(limit=limit)
-
-            # Filter emails
+            # Build the filter first so the server can pre-filter the search
             filter_obj = EmailFilter(
                 subject_keywords=keywords or [],
                 sender_keywords=senders or []
             )
-            filtered_emails = filter_obj.filter_emails(emails)
+
+            # Fetch only emails matching the filter's IMAP search criteria
+            emails = self.client.fetch_emails(limit=limit, search=filter_obj.to_imap_search())
+
+            # Filter emails
+            matches = filter_obj.filter_batch(emails)
+            filtered_emails = [email_data for email_data, matched in zip(emails, matches) if matched]
+            if not filtered_emails:
+                print("ℹ️ No emails matched the filter; no CSV file written.")
+                return
 
             # Extract links from filtered emails
             extractor = LinkExtractor()
             extracted_links = []
-            for email_data in filtered_emails:
-                links = extractor.extract_links_from_text(email_data["body"])
+            bodies = [email_data["body"] for email_data in filtered_emails]
+            for email_data, links in zip(filtered_emails, extractor.extract_links_from_texts(bodies)):
                 for link in links:
                     extracted_links.append((email_data.get("uid", "N/A"), link))
 
@@ -65,6 +71,7 @@ class EmailProcessor:
 
         except Exception as e:
             print(f"❌ An error occurred while processing emails: {e}")
+            raise  # Re-raise so callers can tell a failed run from one without links
         finally:
             # Disconnect from the email server
             self.client.disconnect()
@@ -84,6 +91,7 @@ class EmailProcessor:
                 writer.writerows(data)  # Write rows
         except Exception as e:
             print(f"❌ Failed to save data to CSV: {e}")
+            raise
 
 
 if __name__ == "__main__":
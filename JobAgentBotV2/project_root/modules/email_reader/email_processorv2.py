@@ -18,12 +18,13 @@ class EmailClientInterface(Protocol):
         Connects to the email server.
         """
         ...
-    def fetch_emails(self, limit: int = 100) -> List[dict]:
+    def fetch_emails(self, limit: int = 100, search: str = "ALL") -> List[dict]:
         """
         Fetches emails from the server.
 
         Args:
             limit (int): The maximum number of emails to fetch (default is 100).
+            search (str): IMAP search criteria evaluated by the server (default is "ALL").
 
         Returns:
             List[dict]: A list of dictionaries, where each dictionary represents an email
@@ -52,6 +53,14 @@ class EmailFilterInterface(Protocol):
             sender_keywords (List[str]): Keywords to look for in the sender's email address.
         """
         ...
+    def to_imap_search(self) -> str:
+        """
+        Builds an IMAP search string equivalent to the filter criteria.
+
+        Returns:
+            str: The search criteria to pass to the email server.
+        """
+        ...
     def filter_emails(self, emails: List[dict]) -> List[dict]:
         """
         Filters a list of emails based on the initialized keywords.
@@ -137,14 +146,14 @@ class EmailProcessor:
             # Connect to the email server using the injected or default EmailClient.
             self.client.connect()
 
-            # Fetch emails from the server.
-            emails = self.client.fetch_emails(limit=limit)
-
             # Update filter criteria based on the provided keywords and senders.
             # This allows the filter to be configured dynamically for each processing task.
             self.filter.subject_keywords = keywords or []
             self.filter.sender_keywords = senders or []
 
+            # Fetch emails from the server, letting it pre-filter with the same criteria.
+            emails = self.client.fetch_emails(limit=limit, search=self.filter.to_imap_search())
+
             # Filter the fetched emails using the injected or default EmailFilter.
             filtered_emails = self.filter.filter_emails(emails)
 
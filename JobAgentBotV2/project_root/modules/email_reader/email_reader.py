@@ -1,12 +1,32 @@
+import os
+import sys
+import csv
+import signal
+import queue
 import imaplib
+import threading
 import email
+from datetime import datetime
 from email.message import Message
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+from core.utils.config_loader import get_config, load_env
 from core.utils.logger_config import get_logger
+from modules.email_reader.email_client import iter_uids
+from modules.email_reader.tuned_imap import TunedIMAP4_SSL
+from modules.email_link_extractor.link_extractor import LinkExtractor
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Settings used by cli_main()
+CHECKPOINT_FILE = "checkpoint.txt"
+CHECKPOINT_INTERVAL = 50  # Write the checkpoint once every N processed emails
+OUTPUT_DIR = "output"
+CSV_QUEUE_SIZE = 10000  # Max (uid, link) rows waiting for the writer thread
+
+# Set by the SIGINT handler so cli_main() can stop after the current email
+should_exit = False
+
 class EmailReader:
     def __init__(self, server: str, email_user: str, email_pass: str):
         """
@@ -24,7 +44,7 @@ class EmailReader:
         """
         try:
             logger.info(f"Connecting to IMAP server: {self.server}")
-            self.mail = imaplib.IMAP4_SSL(self.server)
+            self.mail = TunedIMAP4_SSL(self.server)
             self.mail.login(self.email_user, self.email_pass)
             logger.info("Successfully connected and logged in.")
         except imaplib.IMAP4.error as e:
@@ -43,31 +63,7 @@ class EmailReader:
             List[Message]: A list of email.message.Message objects.
         """
         try:
-            logger.info(f"Selecting folder: {folder}")
-            result, _ = self.mail.select(folder)
-            if result != "OK":
-                logger.error(f"Failed to select folder: {folder}")
-                raise Exception(f"Failed to select folder: {folder}")
-
-            logger.info(f"Searching emails with criteria: {criteria}")
-            result, data = self.mail.search(None, criteria)
-            if result != "OK":
-                logger.error(f"Failed to search emails with criteria: {criteria}")
-                raise Exception(f"Failed to search emails with criteria: {criteria}")
-
-            email_ids = data[0].split()
-            emails = []
-
-            logger.info(f"Found {len(email_ids)} emails. Fetching emails...")
-            for email_id in email_ids:
-                result, message_parts = self.mail.fetch(email_id, "(RFC822)")
-                if result != "OK":
-                    logger.warning(f"Failed to fetch email with ID: {email_id}")
-                    continue
-                raw_email = message_parts[0][1]
-                msg = email.message_from_bytes(raw_email)
-                emails.append(msg)
-
+            emails = [msg for _, msg in self.iter_emails(folder, criteria)]
             logger.info(f"Successfully fetched {len(emails)} emails.")
             return emails
 
@@ -75,6 +71,38 @@ class EmailReader:
             logger.error(f"An error occurred while fetching emails: {e}")
             raise Exception(f"An error occurred while fetching emails: {e}")
 
+    def iter_emails(self, folder: str = "inbox", criteria: str = "ALL") -> Iterator[Tuple[bytes, Message]]:
+        """
+        Lazily fetch emails from the specified folder based on the given criteria.
+
+        Args:
+            folder (str): The folder to fetch emails from (default is "inbox").
+            criteria (str): The search criteria (default is "ALL").
+
+        Yields:
+            Tuple[bytes, Message]: The email ID and its email.message.Message object.
+        """
+        logger.info(f"Selecting folder: {folder}")
+        result, _ = self.mail.select(folder)
+        if result != "OK":
+            logger.error(f"Failed to select folder: {folder}")
+            raise Exception(f"Failed to select folder: {folder}")
+
+        logger.info(f"Searching emails with criteria: {criteria}")
+        result, data = self.mail.search(None, criteria)
+        if result != "OK":
+            logger.error(f"Failed to search emails with criteria: {criteria}")
+            raise Exception(f"Failed to search emails with criteria: {criteria}")
+
+        logger.info("Search complete. Fetching emails...")
+        for email_id in iter_uids(data[0] or b""):
+            result, message_parts = self.mail.fetch(email_id, "(RFC822)")
+            if result != "OK":
+                logger.warning(f"Failed to fetch email with ID: {email_id}")
+                continue
+            raw_email = message_parts[0][1]
+            yield email_id, email.message_from_bytes(raw_email)
+
     def disconnect(self):
         """
         Disconnect from the IMAP server.
@@ -98,4 +126,172 @@ class EmailReader:
         """
         Context manager exit point.
         """
-        self.disconnect()
\ No newline at end of file
+        self.disconnect()
+
+
+def get_text_payload(msg: Message) -> bytes:
+    """
+    Extract the plain text body of an email message as raw (UTF-8) bytes.
+    """
+    body = b""
+    if msg.is_multipart():
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            content_disposition = str(part.get("Content-Disposition"))
+
+            if content_type == "text/plain" and "attachment" not in content_disposition:
+                body = part.get_payload(decode=True) or b""
+    else:
+        body = msg.get_payload(decode=True) or b""
+    return body
+
+
+def get_text_body(msg: Message) -> str:
+    """
+    Extract the plain text body from an email message.
+    """
+    return get_text_payload(msg).decode('utf-8', errors='ignore')
+
+
+def save_checkpoint(uid: int):
+    """
+    Save the ID of the last processed email to the checkpoint file.
+    """
+    with open(CHECKPOINT_FILE, "w") as f:
+        f.write(str(uid))
+    logger.info(f"Saved checkpoint at UID {uid}.")
+
+
+def load_checkpoint() -> int:
+    """
+    Load the ID of the last processed email, or 0 if there is no checkpoint.
+    """
+    if os.path.exists(CHECKPOINT_FILE):
+        with open(CHECKPOINT_FILE, "r") as f:
+            return int(f.read())
+    return 0
+
+
+def _request_exit(sig, frame):
+    """
+    SIGINT handler: finish the current email, save progress and exit.
+    """
+    global should_exit
+    logger.warning("Ctrl+C detected. Will save progress and exit after current email...")
+    should_exit = True
+
+
+def csv_writer(rows: "queue.Queue", output_filename: str, errors: Optional[List[Exception]] = None):
+    """
+    Drain (uid, link) rows from the queue into a CSV file until a None
+    sentinel arrives. The file is only created once the first row comes in,
+    and is flushed whenever the queue runs empty so that rows acknowledged
+    through rows.join() are on disk.
+
+    The first write error is appended to errors; later rows are only
+    acknowledged, not written, so the caller must check errors after
+    rows.join() before treating the rows as saved.
+    """
+    csvfile = None
+    writer = None
+    failed = False
+    try:
+        while (row := rows.get()) is not None:
+            try:
+                if not failed:
+                    if csvfile is None:
+                        csvfile = open(output_filename, "w", newline="", encoding="utf-8", buffering=1 << 20)
+                        writer = csv.writer(csvfile)
+                        writer.writerow(["UID", "Link"])
+                    writer.writerow(row)
+                    if rows.empty():
+                        csvfile.flush()
+            except Exception as e:
+                failed = True
+                logger.error(f"Failed to write link for email UID {row[0]}, no more links will be saved: {e}")
+                if errors is not None:
+                    errors.append(e)
+            finally:
+                rows.task_done()
+        rows.task_done()
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+
+
+def cli_main():
+    """
+    Command line entry point: extract links from every email received since
+    the last checkpoint and save them to a timestamped CSV file.
+    """
+    load_env()
+    imap_server = get_config("IMAP_SERVER", "imap.gmail.com")
+    email_user = get_config("EMAIL_USER")
+    email_pass = get_config("EMAIL_PASS")
+    mailbox = get_config("MAILBOX", "inbox")
+
+    signal.signal(signal.SIGINT, _request_exit)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    last_processed_uid = load_checkpoint()
+    # Let the server skip everything up to the checkpoint
+    criteria = f"{last_processed_uid + 1}:*" if last_processed_uid else "ALL"
+    last_uid = last_processed_uid
+    processed_count = 0
+    link_count = 0
+
+    # CSV rows are written by a background thread so disk writes don't hold up the next fetch
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_filename = os.path.join(OUTPUT_DIR, f"extracted_links_{timestamp}.csv")
+    rows = queue.Queue(maxsize=CSV_QUEUE_SIZE)
+    write_errors: List[Exception] = []
+    writer_thread = threading.Thread(target=csv_writer, args=(rows, output_filename, write_errors), daemon=True)
+    writer_thread.start()
+
+    try:
+        with EmailReader(imap_server, email_user, email_pass) as reader:
+            for email_id, msg in reader.iter_emails(mailbox, criteria):
+                uid_int = int(email_id)
+                if uid_int <= last_processed_uid:
+                    continue  # "n:*" still matches the newest email when n is past the end
+
+                try:
+                    for link in LinkExtractor.extract_links_from_bytes(get_text_payload(msg)):
+                        rows.put((uid_int, link))
+                        link_count += 1
+                except Exception as e:
+                    logger.error(f"Error processing email UID {uid_int}: {e}")
+
+                last_uid = max(last_uid, uid_int)
+                processed_count += 1
+                if processed_count % CHECKPOINT_INTERVAL == 0:
+                    rows.join()  # Links up to last_uid must be on disk before checkpointing
+                    if write_errors:
+                        raise write_errors[0]  # Their links were lost, so keep the old checkpoint
+                    save_checkpoint(last_uid)
+
+                if should_exit:
+                    logger.info("Gracefully exiting after saving progress...")
+                    break
+    finally:
+        rows.put(None)
+        writer_thread.join()
+
+    if write_errors:
+        raise write_errors[0]
+    if last_uid > last_processed_uid:
+        save_checkpoint(last_uid)
+
+    if link_count:
+        logger.info(f"Saved {link_count} links to {output_filename}.")
+
+
+if __name__ == "__main__":
+    try:
+        cli_main()
+    except KeyboardInterrupt:
+        logger.warning("KeyboardInterrupt detected. Exiting gracefully...")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        sys.exit(1)
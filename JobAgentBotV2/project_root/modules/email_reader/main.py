@@ -36,18 +36,18 @@ def main():
         mailbox=config.MAILBOX
     )
 
-    # Connect and fetch emails
-    client.connect()
-    emails = client.fetch_emails(limit=100)  # Fetch latest 100 emails
-
     # Initialize the filter with criteria
     email_filter = EmailFilter(
         subject_keywords=["urgent", "important", "action required"],
         sender_addresses=["boss@example.com", "alerts@example.com"]
     )
 
+    # Connect and fetch the latest 100 emails matching the filter on the server
+    client.connect()
+    emails = client.fetch_emails(limit=100, search=email_filter.to_imap_search())
+
     # Filter emails
-    filtered_emails = email_filter.filter_emails(emails)
+    filtered_emails = [email for email, matched in zip(emails, email_filter.filter_batch(emails)) if matched]
 
     # Display filtered emails
     print(f"\nTotal filtered emails: {len(filtered_emails)}\n")
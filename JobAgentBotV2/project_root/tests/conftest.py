@@ -0,0 +1,13 @@
+# tests/conftest.py
+# Imported by pytest (and by every pytest-xdist worker) before any test module is
+# collected. Importing the email reading stack here once means the test modules'
+# own imports of it are module cache lookups.
+import os
+import sys
+
+# The project root is put on sys.path once, here, for every test module
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import modules.email_reader.email_processor  # noqa: F401
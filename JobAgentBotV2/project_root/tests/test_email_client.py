@@ -1,27 +1,52 @@
+import email
+import email.header
+import imaplib
 import unittest
 from unittest.mock import patch, MagicMock
 from email.message import Message
-from modules.email_reader.email_client import EmailClient
+from modules.email_reader.email_client import EmailClient, EmailClientPool, iter_uids, HEADER_FETCH_ITEMS
 
 
 class TestEmailClient(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Set up the EmailClient instance with dummy credentials.
+        Set up the EmailClient instance with dummy credentials, shared by all tests.
         """
-        self.client = EmailClient(
+        cls.client = EmailClient(
             imap_server="imap.example.com",
             email_user="dummy@example.com",
-            email_pass="password"
+            email_pass="password",
+            pool=None  # Open a fresh (mocked) connection in every test
         )
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
-    def test_connect_success(self, mock_imap):
+    def setUp(self):
         """
-        Test successful connection to the IMAP server.
+        Reset the connection state left behind by the previous test.
+        """
+        self.client.connection = None
+        self.client.is_connected = False
+
+    @staticmethod
+    def _make_mock_connection(mock_imap, *uid_responses):
+        """
+        Make the patched TunedIMAP4_SSL return a mock connection whose uid()
+        calls answer with the given responses in order.
         """
         mock_connection = MagicMock()
+        if len(uid_responses) == 1:
+            mock_connection.uid.return_value = uid_responses[0]
+        elif uid_responses:
+            mock_connection.uid.side_effect = list(uid_responses)
         mock_imap.return_value = mock_connection
+        return mock_connection
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_connect_success(self, mock_imap):
+        """
+        Test successful connection to the IMAP server.
+        """
+        mock_connection = self._make_mock_connection(mock_imap)
 
         self.client.connect()
 
@@ -29,7 +54,7 @@ class TestEmailClient(unittest.TestCase):
         mock_connection.login.assert_called_once_with("dummy@example.com", "password")
         mock_connection.select.assert_called_once_with("INBOX")
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
     def test_connect_failure(self, mock_imap):
         """
         Test connection failure to the IMAP server.
@@ -41,13 +66,12 @@ class TestEmailClient(unittest.TestCase):
 
         self.assertIn("Connection failed", str(context.exception))
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
     def test_disconnect_success(self, mock_imap):
         """
         Test successful disconnection from the IMAP server.
         """
-        mock_connection = MagicMock()
-        mock_imap.return_value = mock_connection
+        mock_connection = self._make_mock_connection(mock_imap)
 
         self.client.connect()
         self.client.disconnect()
@@ -55,21 +79,88 @@ class TestEmailClient(unittest.TestCase):
         mock_connection.close.assert_called_once()
         mock_connection.logout.assert_called_once()
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
-    def test_fetch_emails_success(self, mock_imap):
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_disconnect_releases_to_pool(self, mock_imap):
         """
-        Test fetching emails successfully.
+        Test that a pooled client keeps the connection open on disconnect and reuses it.
+        """
+        mock_connection = self._make_mock_connection(mock_imap)
+        pool = EmailClientPool()
+        client = EmailClient("imap.example.com", "dummy@example.com", "password", pool=pool)
+
+        client.connect()
+        client.disconnect()
+        mock_connection.logout.assert_not_called()
+
+        self.assertTrue(client.connect())
+        mock_imap.assert_called_once()  # Second connect reused the pooled session
+        mock_connection.noop.assert_called_once()
+
+        client.disconnect()
+        pool.close_all()
+        mock_connection.logout.assert_called_once()
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_pool_not_shared_across_passwords(self, mock_imap):
+        """
+        Test that a client with a different password logs in again instead of reusing a pooled session.
+        """
+        mock_imap.return_value.login.side_effect = [None, imaplib.IMAP4.error("AUTHENTICATIONFAILED")]
+        pool = EmailClientPool()
+        client = EmailClient("imap.example.com", "dummy@example.com", "password", pool=pool)
+        client.connect()
+        client.disconnect()
+
+        wrong_password = EmailClient("imap.example.com", "dummy@example.com", "wrong", pool=pool)
+        self.assertFalse(wrong_password.connect())
+        self.assertEqual(mock_imap.return_value.login.call_count, 2)
+        pool.close_all()
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_pool_reconnects_after_abort(self, mock_imap):
+        """
+        Test that a pooled connection failing NOOP is replaced by a new one.
+        """
+        stale_connection = MagicMock()
+        stale_connection.noop.side_effect = imaplib.IMAP4.abort("socket closed")
+        fresh_connection = MagicMock()
+        mock_imap.side_effect = [stale_connection, fresh_connection]
+        pool = EmailClientPool()
+        client = EmailClient("imap.example.com", "dummy@example.com", "password", pool=pool)
+
+        client.connect()
+        client.disconnect()
+        client.connect()
+
+        self.assertIs(client.connection, fresh_connection)
+        pool.close_all()
+
+    def test_pool_evicts_idle_connections(self):
+        """
+        Test that connections idle past the timeout are logged out.
         """
         mock_connection = MagicMock()
-        mock_imap.return_value = mock_connection
+        pool = EmailClientPool(idle_timeout=0)
+        key = EmailClient("imap.example.com", "dummy@example.com", "password", pool=pool).pool_key
+        pool.release(key, mock_connection)
 
+        pool.evict_idle()
+
+        mock_connection.logout.assert_called_once()
+        self.assertIsNone(pool.acquire(key))
+        pool.close_all()
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_fetch_emails_success(self, mock_imap):
+        """
+        Test fetching emails successfully.
+        """
         # Mock the IMAP server responses
-        mock_connection.uid.return_value = ("OK", [b"1 2"])
-        mock_connection.uid.side_effect = [
+        mock_connection = self._make_mock_connection(
+            mock_imap,
             ("OK", [b"1 2"]),
-            ("OK", [(b"1", b"Subject: Test Email 1")]),
-            ("OK", [(b"2", b"Subject: Test Email 2")]),
-        ]
+            ("OK", [(b"1", b"Subject: Test Email 1"), b")", (b"2", b"Subject: Test Email 2"), b")"]),
+        )
 
         self.client.connect()
         emails = self.client.fetch_emails(limit=2)
@@ -77,17 +168,84 @@ class TestEmailClient(unittest.TestCase):
         self.assertEqual(len(emails), 2)
         self.assertEqual(emails[0]["subject"], "Test Email 1")
         self.assertEqual(emails[1]["subject"], "Test Email 2")
+        mock_connection.uid.assert_called_with('fetch', "1,2", "(BODY.PEEK[])")
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_fetch_emails_headers_only(self, mock_imap):
+        """
+        Test fetching only the header fields and loading a body on demand.
+        """
+        mock_connection = self._make_mock_connection(
+            mock_imap,
+            ("OK", [b"1"]),
+            ("OK", [(b"1 (UID 1 BODY[HEADER.FIELDS (SUBJECT FROM)] {22}", b"Subject: Test Email 1\r\n\r\n"), b")"]),
+            ("OK", [(b"1 (UID 1 BODY[] {33}", b"Subject: Test Email 1\r\n\r\nBody text"), b")"]),
+        )
+
+        self.client.connect()
+        emails = self.client.fetch_emails(limit=1, fetch_items=HEADER_FETCH_ITEMS)
+
+        self.assertEqual(emails[0]["subject"], "Test Email 1")
+        self.assertEqual(emails[0]["body"], "")
+        self.assertIn("BODY.PEEK[HEADER.FIELDS", mock_connection.uid.call_args.args[2])
+
+        self.assertEqual(self.client.fetch_body(emails[0]["uid"]), "Body text")
+        mock_connection.uid.assert_called_with('fetch', "1", "(BODY.PEEK[])")
+
+    @patch("modules.email_reader.email_client.FETCH_BATCH_SIZE", 2)
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_fetch_emails_batches(self, mock_imap):
+        """
+        Test that UIDs are fetched in batches and matched by the UID in each response.
+        """
+        mock_connection = self._make_mock_connection(
+            mock_imap,
+            ("OK", [b"5 7 9"]),
+            ("OK", [(b"2 (UID 7 BODY[] {22}", b"Subject: Test Email 7"), b")"]),
+            ("OK", [(b"3 (UID 9 BODY[] {22}", b"Subject: Test Email 9"), b")"]),
+        )
+
+        self.client.connect()
+        emails = self.client.fetch_emails(limit=3)
+
+        self.assertEqual([e["uid"] for e in emails], ["7", "9"])
+        self.assertEqual(emails[1]["subject"], "Test Email 9")
+        self.assertEqual(mock_connection.uid.call_count, 3)
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
+    def test_fetch_emails_parallel(self, mock_imap):
+        """
+        Test that concurrency splits the UIDs across separate IMAP connections.
+        """
+        first_connection = MagicMock()
+        second_connection = MagicMock()
+        mock_imap.side_effect = [first_connection, second_connection]
+
+        first_connection.uid.side_effect = [
+            ("OK", [b"1 2 3 4"]),
+            ("OK", [(b"1 (UID 1 BODY[] {22}", b"Subject: Test Email 1"), b")",
+                    (b"2 (UID 2 BODY[] {22}", b"Subject: Test Email 2"), b")"]),
+        ]
+        second_connection.uid.return_value = (
+            "OK", [(b"3 (UID 3 BODY[] {22}", b"Subject: Test Email 3"), b")",
+                   (b"4 (UID 4 BODY[] {22}", b"Subject: Test Email 4"), b")"])
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
+        self.client.connect()
+        emails = self.client.fetch_emails(limit=4, concurrency=2)
+
+        self.assertEqual([e["subject"] for e in emails],
+                         ["Test Email 1", "Test Email 2", "Test Email 3", "Test Email 4"])
+        first_connection.uid.assert_called_with('fetch', "1,2", "(BODY.PEEK[])")
+        second_connection.uid.assert_called_once_with('fetch', "3,4", "(BODY.PEEK[])")
+        second_connection.logout.assert_called_once()
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
     def test_fetch_emails_failure(self, mock_imap):
         """
         Test failure when fetching emails.
         """
-        mock_connection = MagicMock()
-        mock_imap.return_value = mock_connection
-
         # Simulate a failure in the UID search
-        mock_connection.uid.return_value = ("NO", None)
+        self._make_mock_connection(mock_imap, ("NO", None))
 
         self.client.connect()
         with self.assertRaises(Exception) as context:
@@ -95,29 +253,25 @@ class TestEmailClient(unittest.TestCase):
 
         self.assertIn("Failed to search for emails", str(context.exception))
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
     def test_fetch_emails_empty_folder(self, mock_imap):
         """
         Test fetching emails from an empty folder.
         """
-        mock_connection = MagicMock()
-        mock_imap.return_value = mock_connection
-
         # Simulate an empty folder
-        mock_connection.uid.return_value = ("OK", [b""])
+        self._make_mock_connection(mock_imap, ("OK", [b""]))
 
         self.client.connect()
         emails = self.client.fetch_emails()
 
         self.assertEqual(emails, [])
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
     def test_decode_header(self, mock_imap):
         """
         Test decoding email headers.
         """
-        mock_connection = MagicMock()
-        mock_imap.return_value = mock_connection
+        self._make_mock_connection(mock_imap)
 
         # Simulate a raw email with encoded headers
         raw_email = b"Subject: =?UTF-8?B?VGVzdCBFbWFpbA==?="
@@ -129,13 +283,24 @@ class TestEmailClient(unittest.TestCase):
 
         self.assertEqual(decoded_subject, "Test Email")
 
-    @patch("modules.email_reader.email_client.imaplib.IMAP4_SSL")
+    def test_decode_header_cached(self):
+        """
+        Test that decoding the same header value twice only parses it once.
+        """
+        value = "=?UTF-8?B?Q2FjaGVkIFN1YmplY3Q=?="
+        with patch("modules.email_reader.email_client.decode_header",
+                   wraps=email.header.decode_header) as mock_decode:
+            self.assertEqual(self.client._decode_header(value), "Cached Subject")
+            self.assertEqual(self.client._decode_header(value), "Cached Subject")
+
+        self.assertEqual(mock_decode.call_count, 1)
+
+    @patch("modules.email_reader.email_client.TunedIMAP4_SSL")
     def test_get_body(self, mock_imap):
         """
         Test extracting the plain text body from an email.
         """
-        mock_connection = MagicMock()
-        mock_imap.return_value = mock_connection
+        self._make_mock_connection(mock_imap)
 
         # Simulate a raw email with a plain text body
         msg = Message()
@@ -146,6 +311,30 @@ class TestEmailClient(unittest.TestCase):
 
         self.assertEqual(body, "This is a test email body.")
 
+    def test_get_body_cached(self):
+        """
+        Test that a second _get_body call on the same message does not walk it again.
+        """
+        msg = email.message_from_string(
+            'Content-Type: multipart/alternative; boundary="b"\n\n'
+            '--b\nContent-Type: text/plain\n\nPlain body\n'
+            '--b\nContent-Type: text/html\n\n<p>HTML body</p>\n'
+            '--b--\n'
+        )
+
+        with patch.object(msg, "walk", wraps=msg.walk) as mock_walk:
+            self.assertEqual(self.client._get_body(msg), "Plain body")
+            self.assertEqual(self.client._get_body(msg), "Plain body")
+
+        self.assertEqual(mock_walk.call_count, 1)
+
+    def test_iter_uids(self):
+        """
+        Test streaming UIDs out of a raw UID SEARCH response.
+        """
+        self.assertEqual(list(iter_uids(b"1 2  30 ")), [b"1", b"2", b"30"])
+        self.assertEqual(list(iter_uids(b"")), [])
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -1,22 +1,30 @@
 import unittest
-from email.message import EmailMessage
-from modules.email_reader.email_filter import EmailFilter
-import sys
-sys.path.append("d:/Automation/JobAgentBotV2/project_root/modules/email_reader/")
+from unittest.mock import patch
+from email.message import EmailMessage, Message
+from modules.email_reader.email_filter import EmailFilter, KeywordMatcher, _trie_pattern, hyperscan
 
 class TestEmailFilter(unittest.TestCase):
 
-    def setUp(self):
-        self.subject_keywords = ["urgent", "important", "action required"]
-        self.sender_keywords = ["boss@example.com", "admin@example.com"]
-        self.max_attachment_size = 1024 * 1024  # 1 MB
-        self.importance_levels = ["high", "urgent"]
-        self.filter = EmailFilter(
-            subject_keywords=self.subject_keywords,
-            sender_keywords=self.sender_keywords,
-            max_attachment_size=self.max_attachment_size,
-            importance_levels=self.importance_levels
+    @classmethod
+    def setUpClass(cls):
+        # The filter is not modified by the tests, so one instance is shared
+        cls.subject_keywords = ["urgent", "important", "action required"]
+        cls.sender_keywords = ["boss@example.com", "admin@example.com"]
+        cls.max_attachment_size = 1024 * 1024  # 1 MB
+        cls.importance_levels = ["high", "urgent"]
+        cls.filter = EmailFilter(
+            subject_keywords=cls.subject_keywords,
+            sender_keywords=cls.sender_keywords,
+            max_attachment_size=cls.max_attachment_size,
+            importance_levels=cls.importance_levels
         )
+        # Encoding a 1 MB attachment is the slowest setup here, and the filter only reads the message
+        cls.large_attachment_email = EmailMessage()
+        cls.large_attachment_email['Subject'] = "Important document attached"
+        cls.large_attachment_email['From'] = "boss@example.com"
+        cls.large_attachment_email['Importance'] = "high"
+        cls.large_attachment_email.add_attachment(b"a" * (cls.max_attachment_size + 1), maintype="application",
+                                                  subtype="octet-stream", filename="large_file.txt")
 
     def test_filter_by_subject_keyword(self):
         email = EmailMessage()
@@ -24,6 +32,20 @@ class TestEmailFilter(unittest.TestCase):
         email['From'] = "someone@example.com"
         self.assertTrue(self.filter.filter_email(email))
 
+    def test_filter_by_subject_keyword_dict(self):
+        email = {"subject": "This is an urgent update", "from": "boss@example.com", "importance": "high"}
+        self.assertTrue(self.filter.filter_email(email))
+        email["subject"] = "Weekly digest"
+        self.assertFalse(self.filter.filter_email(email))
+
+    def test_to_filter_dict(self):
+        email = self.large_attachment_email
+        email_dict = self.filter.to_filter_dict(email)
+
+        self.assertEqual(email_dict["attachments_size"], self.max_attachment_size + 1)
+        self.assertEqual(self.filter.filter_email(email_dict), self.filter.filter_email(email))
+        self.assertEqual(self.filter.filter_batch([email_dict, email]), [False, False])
+
     def test_filter_by_sender_keyword(self):
         email = EmailMessage()
         email['Subject'] = "Random subject"
@@ -58,18 +80,98 @@ class TestEmailFilter(unittest.TestCase):
         )
         self.assertTrue(self.filter.filter_email(email))  # Now this should pass
 
-        # Add a large attachment exceeding the max size
-        large_attachment = b"a" * (self.max_attachment_size + 1)
-        email = EmailMessage()  # Reset email to avoid multiple attachments
-        email['Subject'] = "Important document attached"  # maintain matching subject
-        email['From'] = "someone@example.com"
+        # An attachment exceeding the max size (shared, so no need to reset the email)
+        self.assertFalse(self.filter.filter_email(self.large_attachment_email))  # Now this should correctly fail
+
+    def test_attachment_size_estimated_without_decoding(self):
+        email = EmailMessage()
+        email['Subject'] = "Important document attached"
+        email['From'] = "boss@example.com"
+        email['Importance'] = "high"
         email.add_attachment(
-            large_attachment, 
-            maintype="application", 
-            subtype="octet-stream", 
-            filename="large_file.txt"
+            b"a" * (2 * self.max_attachment_size),
+            maintype="application",
+            subtype="octet-stream",
+            filename="huge_file.bin"
+        )
+        with patch.object(Message, "get_payload", autospec=True, side_effect=Message.get_payload) as mock_get_payload:
+            self.assertFalse(self.filter.filter_email(email))
+
+        self.assertFalse(any(call.kwargs.get("decode") for call in mock_get_payload.call_args_list))
+
+    def test_keyword_matcher(self):
+        matcher = KeywordMatcher(["Urgent", "action required"])
+        self.assertTrue(matcher.matches("please take action required now"))
+        self.assertTrue(matcher.matches("urgent: reply"))
+        self.assertFalse(matcher.matches("weekly newsletter"))
+        self.assertFalse(KeywordMatcher([]).matches("anything"))
+
+    @unittest.skipUnless(hyperscan, "hyperscan is not installed")
+    def test_filter_hyperscan_matches_python(self):
+        texts = ["urgent: reply", "weekly digest", "action required now", "", "importance"]
+        matcher = KeywordMatcher(self.subject_keywords)
+        self.assertIsNotNone(matcher._hs_db)
+        expected = [any(keyword in text for keyword in self.subject_keywords) for text in texts]
+        self.assertEqual(matcher.matches_each(texts), expected)
+        self.assertEqual([matcher.matches(text) for text in texts], expected)
+
+    def test_trie_pattern(self):
+        self.assertEqual(_trie_pattern(["import", "important", "info"]), "i(?:mport|nfo)")
+        self.assertEqual(_trie_pattern(["a.b"]), "a\\.b")
+        self.assertTrue(KeywordMatcher([""]).matches("anything"))
+
+    def test_keywords_reassigned(self):
+        email = EmailMessage()
+        email['Subject'] = "Interview invitation"
+        email['From'] = "boss@example.com"
+        email['Importance'] = "high"
+        email_filter = EmailFilter(
+            subject_keywords=self.subject_keywords,
+            sender_keywords=self.sender_keywords,
+            importance_levels=self.importance_levels
+        )
+        self.assertFalse(email_filter.filter_email(email))
+        email_filter.subject_keywords = ["interview"]
+        self.assertTrue(email_filter.filter_email(email))
+
+    def test_filter_batch_matches_individual(self):
+        subjects = ["urgent: reply", "Weekly digest", "IMPORTANT notice", "", "action required now"]
+        senders = ["boss@example.com", "news@example.com", "admin@example.com"]
+        emails = []
+        for i in range(100):
+            email = EmailMessage()
+            email['Subject'] = subjects[i % len(subjects)]
+            email['From'] = senders[i % len(senders)]
+            if i % 4:
+                email['Importance'] = "high"
+            emails.append(email)
+
+        expected = [self.filter.filter_email(email) for email in emails]
+        self.assertEqual(self.filter.filter_batch(emails), expected)
+        self.assertIn(True, expected)
+        self.assertIn(False, expected)
+
+    def test_matches_each(self):
+        matcher = KeywordMatcher(["urgent", "sale"])
+        texts = ["urgent sale", "", "nothing here", "big sale", "urgent"]
+        self.assertEqual(matcher.matches_each(texts), [matcher.matches(text) for text in texts])
+        self.assertEqual(KeywordMatcher([""]).matches_each(["", "a"]), [True, True])
+
+    def test_to_imap_search(self):
+        expected = (
+            '(OR OR SUBJECT "urgent" SUBJECT "important" SUBJECT "action required") '
+            '(OR FROM "boss@example.com" FROM "admin@example.com") '
+            '(OR OR HEADER Importance "high" HEADER Importance "urgent" HEADER X-Priority "1")'
         )
-        self.assertFalse(self.filter.filter_email(email))  # Now this should correctly fail
+        self.assertEqual(self.filter.to_imap_search(), expected)
+        self.assertEqual(EmailFilter().to_imap_search(), "ALL")
+
+    def test_to_imap_search_skips_non_ascii_keywords(self):
+        email_filter = EmailFilter(subject_keywords=["Rechnung für", "invoice"], sender_keywords=["boss@example.com"])
+        search = email_filter.to_imap_search()
+        self.assertEqual(search, 'FROM "boss@example.com"')
+        search.encode("ascii")  # imaplib's encoding of command arguments
+        self.assertEqual(EmailFilter(subject_keywords=["Rechnung für"]).to_imap_search(), "ALL")
 
 
 if __name__ == "__main__":
@@ -4,19 +4,23 @@ import unittest
 import os
 import json
 import tempfile
+from unittest.mock import patch, MagicMock
 from modules.email_organizer.config_manager import ConfigManager
 
 class TestConfigManager(unittest.TestCase):
-    def setUp(self):
-        # Create a temporary config file for testing
-        self.temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".json")
-        self.config_path = self.temp_file.name
-        self.temp_file.close()
+    @classmethod
+    def setUpClass(cls):
+        # One temporary directory holds the config files of all tests; removed once in tearDownClass
+        cls.temp_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
 
-    def tearDown(self):
-        # Clean up temporary config file after each test
-        if os.path.exists(self.config_path):
-            os.remove(self.config_path)
+    def setUp(self):
+        # Create an empty temporary config file for testing
+        self.config_path = os.path.join(self.temp_dir.name, f"{self._testMethodName}.json")
+        open(self.config_path, 'w').close()
 
     def test_load_default_when_file_missing(self):
         # Test: If the config file is missing, defaults should load correctly
@@ -69,5 +73,47 @@ class TestConfigManager(unittest.TestCase):
         new_config = ConfigManager(config_path=self.config_path)
         self.assertEqual(new_config.get('max_email_size_mb'), large_value)
 
+    def test_coalesced_writes(self):
+        # Test: Many set() calls are written to disk by a single save_config()
+        config = ConfigManager(config_path=self.config_path)
+        with patch('modules.email_organizer.config_manager.os.replace', wraps=os.replace) as mock_replace:
+            for i in range(10):
+                config.set(f'key_{i}', i)
+            config.save_config()
+            config.save_config()  # Nothing changed since the last save, so nothing is written
+
+        mock_replace.assert_called_once()
+        new_config = ConfigManager(config_path=self.config_path)
+        self.assertEqual(new_config.get('key_9'), 9)
+
+    def test_config_dir_computed_once(self):
+        # Test: The directory is derived from the path at construction, "." for a bare file name
+        self.assertEqual(ConfigManager(config_path=self.config_path).config_dir, self.temp_dir.name)
+        self.assertEqual(ConfigManager(config_path="email_organizer_config.json").config_dir, ".")
+
+    def test_save_with_orjson_writer(self):
+        # Test: save_config() writes through orjson.dumps when orjson is installed
+        config = ConfigManager(config_path=self.config_path)
+        config.set('key', 'value')
+        fake_orjson = MagicMock(OPT_INDENT_2=2)
+        fake_orjson.dumps.side_effect = lambda data, option: json.dumps(data, indent=option).encode()
+        with patch('modules.email_organizer.config_manager.orjson', fake_orjson):
+            config.save_config()
+
+        fake_orjson.dumps.assert_called_once_with(config.get_config(), option=2)
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f)['key'], 'value')
+
+    def test_save_without_orjson_same_indent(self):
+        # Test: Without orjson the file is written with the same 2-space indent orjson uses
+        config = ConfigManager(config_path=self.config_path)
+        config.set('key', ['value'])
+        with patch('modules.email_organizer.config_manager.orjson', None):
+            config.save_config()
+
+        with open(self.config_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), json.dumps(config.get_config(), indent=2, ensure_ascii=False))
+
+
 if __name__ == '__main__':
     unittest.main()
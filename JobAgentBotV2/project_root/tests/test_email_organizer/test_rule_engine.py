@@ -1,340 +1,455 @@
 # tests/test_email_organizer/test_rule_engine.py
 import unittest
-import os
-import json
+import sys
+from types import MappingProxyType
+from unittest.mock import patch
 from modules.email_organizer.rule_engine import RuleEngine
 
-class TestRuleEngine(unittest.TestCase):
+def _actions(matches):
+    """The actions of the matched rules; several rules can share an action type."""
+    return [entry["action"] for entry in matches]
 
-    def setUp(self):
-        self.rules_json_data = {
-            "rules": [
-                {
-                    "id": "rule1",
-                    "description": "Move important job portal emails",
-                    "priority": 1,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "contains", "value": "Job Alert"},
-                        {"field": "from", "operation": "ends_with", "value": "@jobportal.com"}
-                    ],
-                    "action": {"type": "move_to_folder", "target": "JobAlerts"}
-                },
-                {
-                    "id": "rule2",
-                    "description": "Mark promotional emails or from specific senders",
-                    "priority": 2,
-                    "condition_logic": "OR",
-                    "conditions": [
-                        {"field": "subject", "operation": "contains", "value": "Sale"},
-                        {"field": "from", "operation": "starts_with", "value": "promotions@"},
-                        {"field": "from", "operation": "in", "value": ["newsletter@companyA.com", "offers@companyB.net"]}
-                    ],
-                    "action": {"type": "add_category", "category_name": "Promotional"}
-                },
-                {
-                    "id": "rule3",
-                    "description": "Use AI scoring for urgent-sounding emails and mark as suspicious",
-                    "priority": 5,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "matches_regex", "value": ".*(urgent|important|critical).*"}
-                    ],
-                    "action": {"type": "mark_as_suspicious", "use_scoring_model": True}
-                },
-                {
-                    "id": "rule4",
-                    "description": "Delete very large emails",
-                    "priority": 6,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "size", "operation": "greater_than", "value": 1000000}
-                    ],
-                    "action": {"type": "delete"}
-                },
-                {
-                    "id": "rule5",
-                    "description": "Stop processing for emails from known contacts",
-                    "priority": 0,
-                    "condition_logic": "OR",
-                    "conditions": [
-                        {"field": "from", "operation": "contains", "value": "friend@example.com"},
-                        {"field": "from", "operation": "contains", "value": "family@example.com"}
-                    ],
-                    "action": {"type": "stop_processing"}
-                },
-                {
-                    "id": "rule6",
-                    "description": "Mark as read if subject is just 'Hello'",
-                    "priority": 3,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "equals_ignore_case", "value": "hello"}
-                    ],
-                    "action": {"type": "mark_as_read"}
-                },
-                {
-                    "id": "rule7",
-                    "description": "Flag emails with no subject",
-                    "priority": 4,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "is_empty", "value": None}
-                    ],
-                    "action": {"type": "add_flag", "flag_type": "no_subject"}
-                },
-                {
-                    "id": "rule8",
-                    "description": "Remove flag if email is not from a specific domain",
-                    "priority": 7,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "from", "operation": "not_contains", "value": "@trusted-domain.com"}
-                    ],
-                    "action": {"type": "remove_flag", "flag_type": "important"}
-                },
-                {
-                    "id": "rule9",
-                    "description": "Forward important attachments",
-                    "priority": 8,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "has_attachments", "operation": "equals", "value": True},
-                        {"field": "attachment_name", "operation": "contains", "value": "report.pdf"}
-                    ],
-                    "action": {"type": "forward_to", "target_email": "reports@example.com"}
-                },
-                {
-                    "id": "rule10",
-                    "description": "Reply to specific sender",
-                    "priority": 9,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "from", "operation": "equals", "value": "support@example.com"},
-                        {"field": "subject", "operation": "startswith", "value": "Ticket #"}
-                    ],
-                    "action": {"type": "reply_with_template", "template_id": "support_reply"}
-                },
-                {
-                    "id": "rule11",
-                    "description": "Set high importance for VIP senders",
-                    "priority": 0.5,
-                    "condition_logic": "OR",
-                    "conditions": [
-                        {"field": "from", "operation": "in", "value": ["ceo@example.com", "president@example.com"]}
-                    ],
-                    "action": {"type": "set_importance", "level": "high"}
-                },
-                {
-                    "id": "rule12",
-                    "description": "Add 'Finance' category for invoices",
-                    "priority": 3.5,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "contains", "value": "Invoice"}
-                    ],
-                    "action": {"type": "add_category", "category_name": "Finance"}
-                },
-                {
-                    "id": "rule13",
-                    "description": "Mark as unread if it's a reminder",
-                    "priority": 6.5,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "contains", "value": "Reminder"}
-                    ],
-                    "action": {"type": "mark_as_unread"}
-                },
-                {
-                    "id": "rule14",
-                    "description": "Check if body is not empty",
-                    "priority": 7.5,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "body", "operation": "is_not_empty", "value": None}
-                    ],
-                    "action": {"type": "no_op"} # Dummy action for testing condition
-                },
-                {
-                    "id": "rule15",
-                    "description": "Check if subject is not in a list",
-                    "priority": 8.5,
-                    "condition_logic": "AND",
-                    "conditions": [
-                        {"field": "subject", "operation": "not_in", "value": ["FWD:", "RE:"]}
-                    ],
-                    "action": {"type": "no_op"} # Dummy action for testing condition
-                }
-            ]
+_RULES_JSON_DATA = {
+    "rules": [
+        {
+            "id": "rule1",
+            "description": "Move important job portal emails",
+            "priority": 1,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "contains", "value": "Job Alert"},
+                {"field": "from", "operation": "ends_with", "value": "@jobportal.com"}
+            ],
+            "action": {"type": "move_to_folder", "target": "JobAlerts"}
+        },
+        {
+            "id": "rule2",
+            "description": "Mark promotional emails or from specific senders",
+            "priority": 2,
+            "condition_logic": "OR",
+            "conditions": [
+                {"field": "subject", "operation": "contains", "value": "Sale"},
+                {"field": "from", "operation": "starts_with", "value": "promotions@"},
+                {"field": "from", "operation": "in", "value": ["newsletter@companyA.com", "offers@companyB.net"]}
+            ],
+            "action": {"type": "add_category", "category_name": "Promotional"}
+        },
+        {
+            "id": "rule3",
+            "description": "Use AI scoring for urgent-sounding emails and mark as suspicious",
+            "priority": 5,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "matches_regex", "value": ".*(urgent|important|critical).*"}
+            ],
+            "action": {"type": "mark_as_suspicious", "use_scoring_model": True}
+        },
+        {
+            "id": "rule4",
+            "description": "Delete very large emails",
+            "priority": 6,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "size", "operation": "greater_than", "value": 1000000}
+            ],
+            "action": {"type": "delete"}
+        },
+        {
+            "id": "rule5",
+            "description": "Stop processing for emails from known contacts",
+            "priority": 0,
+            "condition_logic": "OR",
+            "conditions": [
+                {"field": "from", "operation": "contains", "value": "friend@example.com"},
+                {"field": "from", "operation": "contains", "value": "family@example.com"}
+            ],
+            "action": {"type": "stop_processing"}
+        },
+        {
+            "id": "rule6",
+            "description": "Mark as read if subject is just 'Hello'",
+            "priority": 3,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "equals_ignore_case", "value": "hello"}
+            ],
+            "action": {"type": "mark_as_read"}
+        },
+        {
+            "id": "rule7",
+            "description": "Flag emails with no subject",
+            "priority": 4,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "is_empty", "value": None}
+            ],
+            "action": {"type": "add_flag", "flag_type": "no_subject"}
+        },
+        {
+            "id": "rule8",
+            "description": "Remove flag if email is not from a specific domain",
+            "priority": 7,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "from", "operation": "not_contains", "value": "@trusted-domain.com"}
+            ],
+            "action": {"type": "remove_flag", "flag_type": "important"}
+        },
+        {
+            "id": "rule9",
+            "description": "Forward important attachments",
+            "priority": 8,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "has_attachments", "operation": "equals", "value": True},
+                {"field": "attachment_name", "operation": "contains", "value": "report.pdf"}
+            ],
+            "action": {"type": "forward_to", "target_email": "reports@example.com"}
+        },
+        {
+            "id": "rule10",
+            "description": "Reply to specific sender",
+            "priority": 9,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "from", "operation": "equals", "value": "support@example.com"},
+                {"field": "subject", "operation": "startswith", "value": "Ticket #"}
+            ],
+            "action": {"type": "reply_with_template", "template_id": "support_reply"}
+        },
+        {
+            "id": "rule11",
+            "description": "Set high importance for VIP senders",
+            "priority": 0.5,
+            "condition_logic": "OR",
+            "conditions": [
+                {"field": "from", "operation": "in", "value": ["ceo@example.com", "president@example.com"]}
+            ],
+            "action": {"type": "set_importance", "level": "high"}
+        },
+        {
+            "id": "rule12",
+            "description": "Add 'Finance' category for invoices",
+            "priority": 3.5,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "contains", "value": "Invoice"}
+            ],
+            "action": {"type": "add_category", "category_name": "Finance"}
+        },
+        {
+            "id": "rule13",
+            "description": "Mark as unread if it's a reminder",
+            "priority": 6.5,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "contains", "value": "Reminder"}
+            ],
+            "action": {"type": "mark_as_unread"}
+        },
+        {
+            "id": "rule14",
+            "description": "Check if body is not empty",
+            "priority": 7.5,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "body", "operation": "is_not_empty", "value": None}
+            ],
+            "action": {"type": "no_op"} # Dummy action for testing condition
+        },
+        {
+            "id": "rule15",
+            "description": "Check if subject is not in a list",
+            "priority": 8.5,
+            "condition_logic": "AND",
+            "conditions": [
+                {"field": "subject", "operation": "not_in", "value": ["FWD:", "RE:"]}
+            ],
+            "action": {"type": "no_op"} # Dummy action for testing condition
         }
-        self.rule_engine = RuleEngine(self.rules_json_data)
-
-    # Test case for the 'not_contains' operator
-    def test_condition_operator_not_contains(self):
-        email = {"subject": "Important Announcement", "from": "user@trusted-domain.com"}
-        actions = self.rule_engine.evaluate(email)
-        self.assertNotIn({"type": "remove_flag", "flag_type": "important"}, actions)
-
-        email_trigger = {"subject": "Important Announcement", "from": "spam@example.com"}
-        actions_trigger = self.rule_engine.evaluate(email_trigger)
-        self.assertIn({"type": "remove_flag", "flag_type": "important"}, actions_trigger) # Add a test where it should be found
-    # Test case for the 'startswith' operator
-    def test_condition_operator_startswith(self):
-        email = {"subject": "Ticket #12345: Issue reported", "from": "support@example.com"}
-        actions = self.rule_engine.evaluate(email)
-        self.assertIn({"type": "reply_with_template", "template_id": "support_reply"}, actions)
-
-        email_no_match = {"subject": "Re: Ticket #12345", "from": "support@example.com"}
-        actions_no_match = self.rule_engine.evaluate(email_no_match)
-        self.assertNotIn({"type": "reply_with_template", "template_id": "support_reply"}, actions_no_match)
-
-    # Test case for the 'endswith' operator
-    def test_condition_operator_endswith(self):
-        email = {"subject": "Quarterly report.pdf", "has_attachments": True, "attachment_name": "Quarterly report.pdf"}
-        actions = self.rule_engine.evaluate(email)
-        self.assertIn({"type": "forward_to", "target_email": "reports@example.com"}, actions)
-
-        email_no_match = {"subject": "Quarterly report.txt", "has_attachments": True, "attachment_name": "Quarterly report.txt"}
-        actions_no_match = self.rule_engine.evaluate(email_no_match)
-        self.assertNotIn({"type": "forward_to", "target_email": "reports@example.com"}, actions_no_match)
-
-    # Test case for the 'matches_regex' operator
-    def test_condition_operator_matches_regex(self):
-        email = {"subject": "This is an urgent matter!"}
-        actions = self.rule_engine.evaluate(email)
-        self.assertIn({"type": "mark_as_suspicious", "use_scoring_model": True}, actions)
+    ]
+}
 
-        email_no_match = {"subject": "Important info"}
-        actions_no_match = self.rule_engine.evaluate(email_no_match)
-        self.assertNotIn({"type": "mark_as_suspicious", "use_scoring_model": True}, actions_no_match)
+# Expected actions, shared by the TestRuleEngine assertions
+_ACT_ADD_CATEGORY_PROMOTIONAL = {"type": "add_category", "category_name": "Promotional"}
+_ACT_ADD_CATEGORY_SMALL = {"type": "add_category", "category_name": "small"}
+_ACT_ADD_FLAG_LARGE = {"type": "add_flag", "flag_type": "large"}
+_ACT_ADD_FLAG_NO_SUBJECT = {"type": "add_flag", "flag_type": "no_subject"}
+_ACT_DELETE = {"type": "delete"}
+_ACT_FORWARD_TO_REPORTS = {"type": "forward_to", "target_email": "reports@example.com"}
+_ACT_MARK_AS_READ = {"type": "mark_as_read"}
+_ACT_MARK_AS_SUSPICIOUS_SCORED = {"type": "mark_as_suspicious", "use_scoring_model": True}
+_ACT_MARK_AS_UNREAD = {"type": "mark_as_unread"}
+_ACT_NO_OP = {"type": "no_op"}
+_ACT_REMOVE_FLAG_IMPORTANT = {"type": "remove_flag", "flag_type": "important"}
+_ACT_REPLY_WITH_TEMPLATE_SUPPORT = {"type": "reply_with_template", "template_id": "support_reply"}
 
-    # Test case for the 'equals_ignore_case' operator
-    def test_condition_operator_equals_ignore_case(self):
-        email_lower = {"subject": "hello"}
-        actions_lower = self.rule_engine.evaluate(email_lower)
-        self.assertIn({"type": "mark_as_read"}, actions_lower)
+# (label, email, action, whether the action must be among the matched actions)
+_OPERATOR_CASES = (
+    ("not_contains: trusted sender", {"subject": "Important Announcement", "from": "user@trusted-domain.com"}, _ACT_REMOVE_FLAG_IMPORTANT, False),
+    ("not_contains: other sender", {"subject": "Important Announcement", "from": "spam@example.com"}, _ACT_REMOVE_FLAG_IMPORTANT, True),
+    ("startswith: match", {"subject": "Ticket #12345: Issue reported", "from": "support@example.com"}, _ACT_REPLY_WITH_TEMPLATE_SUPPORT, True),
+    ("startswith: no match", {"subject": "Re: Ticket #12345", "from": "support@example.com"}, _ACT_REPLY_WITH_TEMPLATE_SUPPORT, False),
+    ("endswith: match", {"subject": "Quarterly report.pdf", "has_attachments": True, "attachment_name": "Quarterly report.pdf"}, _ACT_FORWARD_TO_REPORTS, True),
+    ("endswith: no match", {"subject": "Quarterly report.txt", "has_attachments": True, "attachment_name": "Quarterly report.txt"}, _ACT_FORWARD_TO_REPORTS, False),
+    ("matches_regex: match", {"subject": "This is an urgent matter!"}, _ACT_MARK_AS_SUSPICIOUS_SCORED, True),
+    ("matches_regex: no match", {"subject": "Important info"}, _ACT_MARK_AS_SUSPICIOUS_SCORED, False),
+    ("equals_ignore_case: lower", {"subject": "hello"}, _ACT_MARK_AS_READ, True),
+    ("equals_ignore_case: upper", {"subject": "HELLO"}, _ACT_MARK_AS_READ, True),
+    ("equals_ignore_case: mixed", {"subject": "Hello"}, _ACT_MARK_AS_READ, True),
+    ("equals_ignore_case: no match", {"subject": "Hi"}, _ACT_MARK_AS_READ, False),
+    ("greater_than: large", {"size": 1500000}, _ACT_DELETE, True),
+    ("greater_than: small", {"size": 500000}, _ACT_DELETE, False),
+    ("is_empty: empty", {"subject": None}, _ACT_ADD_FLAG_NO_SUBJECT, True),
+    ("is_empty: not empty", {"subject": "Hello"}, _ACT_ADD_FLAG_NO_SUBJECT, False),
+    ("is_not_empty: body", {"body": "This is the email body."}, _ACT_NO_OP, True),
+    ("is_not_empty: no body", {"body": None}, _ACT_NO_OP, False),
+    ("in: listed sender", {"from": "newsletter@companyA.com"}, _ACT_ADD_CATEGORY_PROMOTIONAL, True),
+    ("in: other sender", {"from": "other@example.com"}, _ACT_ADD_CATEGORY_PROMOTIONAL, False),
+    ("not_in: FWD:", {"subject": "FWD:"}, _ACT_NO_OP, False),
+    ("not_in: RE:", {"subject": "RE:"}, _ACT_NO_OP, False),
+    ("not_in: unlisted subject", {"subject": "Urgent Email"}, _ACT_NO_OP, True),
+    ("not_in: listed prefix only", {"subject": "FWD: Important"}, _ACT_NO_OP, True)
+)
 
-        email_upper = {"subject": "HELLO"}
-        actions_upper = self.rule_engine.evaluate(email_upper)
-        self.assertIn({"type": "mark_as_read"}, actions_upper)
-
-        email_mixed = {"subject": "Hello"}
-        actions_mixed = self.rule_engine.evaluate(email_mixed)
-        self.assertIn({"type": "mark_as_read"}, actions_mixed)
+class TestRuleEngine(unittest.TestCase):
 
-        email_no_match = {"subject": "Hi"}
-        actions_no_match = self.rule_engine.evaluate(email_no_match)
-        self.assertNotIn({"type": "mark_as_read"}, actions_no_match)
+    @classmethod
+    def setUpClass(cls):
+        # Each test gets its own shallow list copy; the rules are read-only views, so a test
+        # that tried to edit a shared rule would fail instead of leaking into the next one.
+        # Pre-sorted by priority, so compiling each test's engine sorts already ordered input.
+        cls._base_rules = tuple(MappingProxyType(rule) for rule in sorted(_RULES_JSON_DATA["rules"], key=lambda rule: rule.get("priority", 100)))
 
-    # Test case for the 'greater_than' operator
-    def test_condition_operator_greater_than(self):
-        email_large = {"size": 1500000}
-        actions_large = self.rule_engine.evaluate(email_large)
-        self.assertIn({"type": "delete"}, actions_large)
+    def setUp(self):
+        self.rule_engine = RuleEngine({"rules": list(self._base_rules)})
 
-        email_small = {"size": 500000}
-        actions_small = self.rule_engine.evaluate(email_small)
-        self.assertNotIn({"type": "delete"}, actions_small)
+    # Covers the operators of the loaded rules; see _OPERATOR_CASES
+    def test_all_operators(self):
+        results = self.rule_engine.evaluate_batch([email for _, email, _, _ in _OPERATOR_CASES])
+        for (label, email, action, matched), actions in zip(_OPERATOR_CASES, results):
+            with self.subTest(label=label):
+                if matched:
+                    self.assertIn(action, _actions(actions), f"Expected action not found: {actions}")
+                else:
+                    self.assertNotIn(action, _actions(actions), f"Unexpected action: {actions}")
 
     # Test case for the 'less_than' operator
     def test_condition_operator_less_than(self):
         # Assuming a rule to test 'less_than' exists (no direct one in default)
-        self.rule_engine.rules.append({
+        with self.rule_engine.temporary_rules([{
             "id": "temp_rule_lt",
             "priority": 100,
             "condition_logic": "AND",
             "conditions": [{"field": "size", "operation": "less_than", "value": 600000}],
             "action": {"type": "mark_as_unread"}
-        })
-        email_small = {"size": 500000}
-        actions_small = self.rule_engine.evaluate(email_small)
-        self.assertIn({"type": "mark_as_unread"}, actions_small)
-        self.rule_engine.rules.pop() # Clean up
+        }]):
+            email_small = {"size": 500000}
+            actions_small = self.rule_engine.evaluate(email_small)
+            self.assertIn(_ACT_MARK_AS_UNREAD, _actions(actions_small))
 
         email_large = {"size": 1500000}
         actions_large = self.rule_engine.evaluate(email_large)
-        self.assertNotIn({"type": "mark_as_unread"}, actions_large)
+        self.assertNotIn(_ACT_MARK_AS_UNREAD, _actions(actions_large))
 
     # Test case for the 'greater_than_or_equal' operator
     def test_condition_operator_greater_than_or_equal(self):
-        self.rule_engine.rules.append({
+        with self.rule_engine.temporary_rules([{
             "id": "temp_rule_gte",
             "priority": 100,
             "condition_logic": "AND",
             "conditions": [{"field": "size", "operation": "greater_than_or_equal", "value": 1500000}],
             "action": {"type": "add_flag", "flag_type": "large"}
-        })
-        email_equal = {"size": 1500000}
-        actions_equal = self.rule_engine.evaluate(email_equal)
-        self.assertIn({"type": "add_flag", "flag_type": "large"}, actions_equal)
-        email_greater = {"size": 2000000}
-        actions_greater = self.rule_engine.evaluate(email_greater)
-        self.assertIn({"type": "add_flag", "flag_type": "large"}, actions_greater)
-        self.rule_engine.rules.pop() # Clean up
+        }]):
+            email_equal = {"size": 1500000}
+            actions_equal = self.rule_engine.evaluate(email_equal)
+            self.assertIn(_ACT_ADD_FLAG_LARGE, _actions(actions_equal))
+            email_greater = {"size": 2000000}
+            actions_greater = self.rule_engine.evaluate(email_greater)
+            self.assertIn(_ACT_ADD_FLAG_LARGE, _actions(actions_greater))
 
     # Test case for the 'less_than_or_equal' operator
     def test_condition_operator_less_than_or_equal(self):
-        self.rule_engine.rules.append({
+        with self.rule_engine.temporary_rules([{
             "id": "temp_rule_lte",
             "priority": 100,
             "condition_logic": "AND",
             "conditions": [{"field": "size", "operation": "less_than_or_equal", "value": 500000}],
             "action": {"type": "add_category", "category_name": "small"}
+        }]):
+            email_equal = {"size": 500000}
+            actions_equal = self.rule_engine.evaluate(email_equal)
+            self.assertIn(_ACT_ADD_CATEGORY_SMALL, _actions(actions_equal))
+            email_less = {"size": 300000}
+            actions_less = self.rule_engine.evaluate(email_less)
+            self.assertIn(_ACT_ADD_CATEGORY_SMALL, _actions(actions_less))
+
+# (email, expected actions) for TestCompiledRules' "high" (priority 1) and "low" (priority 5) rules
+_HIGH = {"priority": 1, "action": {"type": "mark_as_read"}}
+_LOW = {"priority": 5, "action": {"type": "add_category", "category_name": "Promotional"}}
+COMPILED_RULES_CASES = (
+    ({"subject": "Big SALE", "size": 200}, [_HIGH, _LOW]),
+    ({"subject": "sale", "size": 50}, [_LOW]),
+    ({"from": "deals@shop.com"}, [_LOW]),
+    ({"from": "friend@example.com", "size": 200}, []),
+    ({"subject": "Hello"}, [])
+)
+
+class TestCompiledRules(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._base_rules = (
+            {
+                "id": "low",
+                "priority": 5,
+                "condition_logic": "OR",
+                "conditions": [
+                    {"field": "subject", "operation": "contains", "value": "sale"},
+                    {"field": "from", "operation": "endswith", "value": "@shop.com"}
+                ],
+                "action": {"type": "add_category", "category_name": "Promotional"}
+            },
+            {
+                "id": "high",
+                "priority": 1,
+                "condition_logic": "AND",
+                "conditions": [
+                    {"field": "subject", "operation": "contains", "value": "sale"},
+                    {"field": "size", "operation": "greater_than", "value": 100}
+                ],
+                "action": {"type": "mark_as_read"}
+            }
+        )
+
+    def setUp(self):
+        self.rule_engine = RuleEngine({"rules": list(self._base_rules)})
+
+    def test_compiled_rules_sorted_by_priority(self):
+        self.assertIsInstance(self.rule_engine._compiled_rules, tuple)
+        self.assertEqual([entry[0] for entry in self.rule_engine._compiled_rules], [1, 5])
+
+    def test_action_types_interned(self):
+        action_type = "".join(["mark_as", "_read"])  # Built at runtime, so not interned
+        rule_engine = RuleEngine({"rules": [{"id": "r", "conditions": [], "action": {"type": action_type}}]})
+        self.assertIs(rule_engine.evaluate({})[0]["action"]["type"], sys.intern("mark_as_read"))
+        self.assertIs(rule_engine.rules[0]["action"]["type"], action_type)  # The caller's rule is left alone
+
+    def test_evaluate_does_not_sort(self):
+        with patch("builtins.sorted", side_effect=AssertionError("evaluate() sorted the rules")):
+            self.rule_engine.evaluate({"subject": "sale", "size": 200})
+
+    def test_evaluate_uses_compiled_rules(self):
+        for email, expected in COMPILED_RULES_CASES:
+            with self.subTest(email=email):
+                self.assertEqual(self.rule_engine.evaluate(email), expected)
+
+    def test_evaluate_recompiles_after_rules_change(self):
+        self.rule_engine.rules.append({
+            "id": "stop",
+            "priority": 0,
+            "conditions": [{"field": "from", "operation": "equals", "value": "friend@example.com"}],
+            "action": {"type": "stop_processing"}
         })
-        email_equal = {"size": 500000}
-        actions_equal = self.rule_engine.evaluate(email_equal)
-        self.assertIn({"type": "add_category", "category_name": "small"}, actions_equal)
-        email_less = {"size": 300000}
-        actions_less = self.rule_engine.evaluate(email_less)
-        self.assertIn({"type": "add_category", "category_name": "small"}, actions_less)
-        self.rule_engine.rules.pop() # Clean up
+        actions = self.rule_engine.evaluate({"from": "friend@example.com", "subject": "sale", "size": 200})
+        self.assertEqual(actions, [{"priority": 0, "action": {"type": "stop_processing"}}])
 
-    # Test case for the 'is_empty' operator
-    def test_condition_operator_is_empty(self):
-        email_empty = {"subject": None}
-        actions_empty = self.rule_engine.evaluate(email_empty)
-        self.assertIn({"type": "add_flag", "flag_type": "no_subject"}, actions_empty)
+    def test_evaluate_recompiles_after_rule_replaced(self):
+        rule_engine = RuleEngine({"rules": [{"id": "r", "conditions": [], "action": {"type": "action_0"}}]})
+        for i in range(1, 50):
+            action = {"type": f"action_{i}"}
+            # The popped rule is freed right before the new one is built, so CPython tends to reuse its id
+            rule_engine.rules.pop()
+            rule_engine.rules.append({"id": "r", "conditions": [], "action": action})
+            self.assertEqual(rule_engine.evaluate({}), [{"priority": 100, "action": {"type": f"action_{i}"}}])
 
-        email_not_empty = {"subject": "Hello"}
-        actions_not_empty = self.rule_engine.evaluate(email_not_empty)
-        self.assertNotIn({"type": "add_flag", "flag_type": "no_subject"}, actions_not_empty)
+    def test_condition_fields(self):
+        rule_engine = RuleEngine({"rules": [
+            {"id": "a", "conditions": [{"field": "subject", "operation": "contains", "value": "x"}],
+             "action": {"type": "no_op"}},
+            {"id": "b", "condition_logic": "OR", "conditions": [
+                {"field": "body", "operation": "contains", "value": "y"},
+                {"field": "from", "operation": "contains", "value": "z"}], "action": {"type": "no_op"}},
+            {"id": "c", "conditions": [], "action": {"type": "no_op"}},
+        ]})
+        self.assertEqual(rule_engine.condition_fields(), {"subject", "body", "from"})
+        free_text = RuleEngine({"rules": [{"name": "n", "condition": "body contains 'x'", "actions": []}]})
+        self.assertIsNone(free_text.condition_fields())
 
-    # Test case for the 'is_not_empty' operator
-    def test_condition_operator_is_not_empty(self):
-        email_not_empty_body = {"body": "This is the email body."}
-        actions_not_empty_body = self.rule_engine.evaluate(email_not_empty_body)
-        self.assertTrue(any(action.get("type") == "no_op" for action in actions_not_empty_body))
+    def test_regex_compiled_once(self):
+        rule_engine = RuleEngine({"rules": [{
+            "id": "regex",
+            "conditions": [{"field": "subject", "operation": "matches_regex", "value": ".*(urgent|critical).*"}],
+            "action": {"type": "mark_as_suspicious"}
+        }]})
+        with patch("modules.email_organizer.rule_engine.re.compile", side_effect=AssertionError("regex recompiled")):
+            self.assertEqual(len(rule_engine.evaluate({"subject": "An urgent matter"})), 1)
+            self.assertEqual(rule_engine.evaluate({"subject": "Hello"}), [])
+            self.assertEqual(rule_engine.evaluate({"subject": None}), [])
 
-        email_empty_body = {"body": None}
-        actions_empty_body = self.rule_engine.evaluate(email_empty_body)
-        self.assertFalse(any(action.get("type") == "no_op" for action in actions_empty_body))
+    def test_invalid_regex_never_matches(self):
+        with self.assertLogs("modules.email_organizer.rule_engine", level="WARNING"):
+            rule_engine = RuleEngine({"rules": [{
+                "id": "bad",
+                "conditions": [{"field": "subject", "operation": "matches_regex", "value": "("}],
+                "action": {"type": "mark_as_read"}
+            }]})
+        self.assertEqual(rule_engine.evaluate({"subject": "("}), [])
 
-    # Test case for the 'in' operator
-    def test_condition_operator_in(self):
-        email_match = {"from": "newsletter@companyA.com"}
-        actions_match = self.rule_engine.evaluate(email_match)
-        self.assertIn({"type": "add_category", "category_name": "Promotional"}, actions_match)
+    def test_temporary_rules_restores_compiled_rules(self):
+        compiled = self.rule_engine._compiled_rules
+        with self.rule_engine.temporary_rules([{
+            "id": "temp",
+            "priority": 0,
+            "conditions": [{"field": "from", "operation": "equals", "value": "boss@example.com"}],
+            "action": {"type": "add_flag", "flag_type": "boss"}
+        }]):
+            self.assertEqual(self.rule_engine.evaluate({"from": "boss@example.com"}),
+                             [{"priority": 0, "action": {"type": "add_flag", "flag_type": "boss"}}])
+        self.assertIs(self.rule_engine._compiled_rules, compiled)
+        self.assertEqual(self.rule_engine.evaluate({"from": "boss@example.com"}), [])
 
-        email_no_match = {"from": "other@example.com"}
-        actions_no_match = self.rule_engine.evaluate(email_no_match)
-        self.assertNotIn({"type": "add_category", "category_name": "Promotional"}, actions_no_match)
+    def test_temporary_rules_merge_matches_full_compile(self):
+        extra_rules = [
+            {"id": "tie", "priority": 1, "conditions": [], "action": {"type": "add_flag", "flag_type": "tie"}},
+            {"id": "first", "priority": 0, "conditions": [], "action": {"type": "add_flag", "flag_type": "first"}},
+            {"id": "last", "priority": 9, "conditions": [], "action": {"type": "add_flag", "flag_type": "last"}}
+        ]
+        expected = RuleEngine({"rules": list(self._base_rules) + extra_rules})._compiled_rules
+        with self.rule_engine.temporary_rules(extra_rules):
+            self.assertEqual([entry[1] for entry in self.rule_engine._compiled_rules],
+                             [entry[1] for entry in expected])
 
-    # Test case for the 'not_in' operator
-    def test_condition_operator_not_in(self):
-        # Test case where the subject IS in the list, so 'no_op' should NOT be triggered
-        email_match_in = {"subject": "FWD:"}
-        actions_match_in = self.rule_engine.evaluate(email_match_in)
-        self.assertFalse(any(action.get("type") == "no_op" for action in actions_match_in), f"Unexpected 'no_op' action: {actions_match_in}")
+    def test_evaluate_skips_rules_for_absent_fields(self):
+        calls = []
+        self.rule_engine.operators["counted"] = lambda a, b: calls.append(b) or True
+        with self.rule_engine.temporary_rules([
+            {"id": "and", "priority": 2, "conditions": [
+                {"field": "cc", "operation": "counted", "value": "and"},
+                {"field": "size", "operation": "counted", "value": "and"}
+            ], "action": {"type": "add_flag", "flag_type": "and"}},
+            {"id": "or", "priority": 3, "condition_logic": "OR", "conditions": [
+                {"field": "bcc", "operation": "counted", "value": "or"},
+                {"field": "size", "operation": "counted", "value": "or"}
+            ], "action": {"type": "add_flag", "flag_type": "or"}},
+            {"id": "always", "priority": 4, "conditions": [], "action": {"type": "add_flag", "flag_type": "always"}}
+        ]):
+            actions = self.rule_engine.evaluate({"size": 200})
+            self.assertEqual(calls, ["or"])
+            self.assertEqual([entry["action"]["flag_type"] for entry in actions], ["or", "always"])
 
-        email_match_in_re = {"subject": "RE:"}
-        actions_match_in_re = self.rule_engine.evaluate(email_match_in_re)
-        self.assertFalse(any(action.get("type") == "no_op" for action in actions_match_in_re), f"Unexpected 'no_op' action: {actions_match_in_re}")
+            calls.clear()
+            self.rule_engine.evaluate({"cc": "a@example.com", "size": 200})
+            self.assertEqual(calls, ["and", "and", "or"])
 
-        # Test case where the subject is NOT in the list, so 'no_op' SHOULD be triggered
-        email_no_match = {"subject": "Urgent Email"}
-        actions_no_match = self.rule_engine.evaluate(email_no_match)
-        self.assertTrue(any(action.get("type") == "no_op" for action in actions_no_match), f"Expected 'no_op' action not found: {actions_no_match}")
+    def test_evaluate_batch_matches_evaluate(self):
+        emails = [{"subject": "Big SALE", "size": 200}, {"from": "deals@shop.com"}, {"subject": "Hello"}]
+        self.assertEqual(self.rule_engine.evaluate_batch(emails), [self.rule_engine.evaluate(email) for email in emails])
+        self.assertEqual(self.rule_engine.evaluate_batch([]), [])
 
-        email_no_match_partial = {"subject": "FWD: Important"}
-        actions_no_match_partial = self.rule_engine.evaluate(email_no_match_partial)
-        self.assertTrue(any(action.get("type") == "no_op" for action in actions_no_match_partial), f"Expected 'no_op' action not found: {actions_no_match_partial}")
\ No newline at end of file
+    def test_read_only_rules_used_without_copying(self):
+        frozen_rules = [MappingProxyType(rule) for rule in self._base_rules]
+        rule_engine = RuleEngine({"rules": frozen_rules})
+        self.assertIs(rule_engine.rules, frozen_rules)
+        self.assertEqual(rule_engine.evaluate({"subject": "Big SALE", "size": 200}),
+                         self.rule_engine.evaluate({"subject": "Big SALE", "size": 200}))
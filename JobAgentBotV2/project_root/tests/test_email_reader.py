@@ -1,7 +1,10 @@
+import os
+import queue
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from email.message import Message
-from modules.email_reader.email_reader import EmailReader
+from modules.email_reader.email_reader import EmailReader, csv_writer, cli_main
 
 
 class TestEmailReader(unittest.TestCase):
@@ -13,7 +16,7 @@ class TestEmailReader(unittest.TestCase):
             email_pass="password"
         )
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_connection_failure(self, mock_imap):
         """
         Test that the connect method raises an exception on connection failure.
@@ -22,7 +25,7 @@ class TestEmailReader(unittest.TestCase):
         with self.assertRaises(Exception):
             self.reader.connect()
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_connect_success(self, mock_imap):
         """
         Test successful connection to the IMAP server.
@@ -44,7 +47,7 @@ class TestEmailReader(unittest.TestCase):
         except Exception:
             self.fail("Disconnect should not fail even if not connected.")
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_disconnect_after_connect(self, mock_imap):
         """
         Test that disconnect works correctly after a successful connection.
@@ -56,7 +59,7 @@ class TestEmailReader(unittest.TestCase):
         self.reader.disconnect()
         mock_mail.logout.assert_called_once()
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_fetch_emails_success(self, mock_imap):
         """
         Test fetching emails successfully.
@@ -80,7 +83,7 @@ class TestEmailReader(unittest.TestCase):
         self.assertEqual(emails[0]["Subject"], "Test Email 1")
         self.assertEqual(emails[1]["Subject"], "Test Email 2")
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_fetch_emails_failure(self, mock_imap):
         """
         Test failure when fetching emails.
@@ -96,7 +99,7 @@ class TestEmailReader(unittest.TestCase):
         with self.assertRaises(Exception):
             self.reader.fetch_emails()
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_fetch_emails_invalid_folder(self, mock_imap):
         """
         Test fetching emails from an invalid folder.
@@ -112,7 +115,7 @@ class TestEmailReader(unittest.TestCase):
             self.reader.fetch_emails(folder="invalid_folder")
         self.assertIn("Failed to select folder", str(context.exception))
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_fetch_emails_empty_folder(self, mock_imap):
         """
         Test fetching emails from an empty folder.
@@ -128,7 +131,7 @@ class TestEmailReader(unittest.TestCase):
         emails = self.reader.fetch_emails()
         self.assertEqual(emails, [])
 
-    @patch("modules.email_reader.email_reader.imaplib.IMAP4_SSL")
+    @patch("modules.email_reader.email_reader.TunedIMAP4_SSL")
     def test_fetch_emails_partial_failure(self, mock_imap):
         """
         Test fetching emails where some fetch operations fail.
@@ -151,5 +154,76 @@ class TestEmailReader(unittest.TestCase):
         self.assertEqual(emails[0]["Subject"], "Test Email 1")
 
 
+    def test_csv_writer(self):
+        """
+        Test that csv_writer writes queued rows under a header and stops at the sentinel.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_filename = os.path.join(tmp_dir, "links.csv")
+            rows = queue.Queue()
+            rows.put((1, "https://example.com/a"))
+            rows.put((2, "https://example.com/b"))
+            rows.put(None)
+
+            csv_writer(rows, output_filename)
+
+            with open(output_filename, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines, ["UID,Link", "1,https://example.com/a", "2,https://example.com/b"])
+
+    def test_csv_writer_no_rows(self):
+        """
+        Test that csv_writer does not create a file when no rows are queued.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_filename = os.path.join(tmp_dir, "links.csv")
+            rows = queue.Queue()
+            rows.put(None)
+
+            csv_writer(rows, output_filename)
+
+            self.assertFalse(os.path.exists(output_filename))
+
+    def test_csv_writer_records_write_error(self):
+        """
+        Test that csv_writer records the first write error and still acknowledges every row.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            rows = queue.Queue()
+            errors = []
+            for uid in (1, 2):
+                rows.put((uid, "https://example.com"))
+            rows.put(None)
+
+            csv_writer(rows, tmp_dir, errors)  # A directory cannot be opened as the CSV file
+
+            rows.join()  # Returns: every row was acknowledged
+            self.assertEqual(len(errors), 1)
+            self.assertIsInstance(errors[0], OSError)
+
+    @patch("modules.email_reader.email_reader.open", create=True, side_effect=OSError("disk full"))
+    @patch("modules.email_reader.email_reader.save_checkpoint")
+    @patch("modules.email_reader.email_reader.load_checkpoint", return_value=0)
+    @patch("modules.email_reader.email_reader.EmailReader")
+    @patch("modules.email_reader.email_reader.signal.signal")
+    @patch("modules.email_reader.email_reader.load_env")
+    def test_cli_main_keeps_checkpoint_after_write_error(self, mock_load_env, mock_signal, mock_reader,
+                                                          mock_load_checkpoint, mock_save_checkpoint, mock_open):
+        """
+        Test that cli_main raises instead of checkpointing past links that could not be written.
+        """
+        msg = Message()
+        msg.set_payload("See https://example.com/job")
+        mock_reader.return_value.__enter__.return_value.iter_emails.return_value = [(b"1", msg), (b"2", msg)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch("modules.email_reader.email_reader.OUTPUT_DIR", tmp_dir), \
+                patch("modules.email_reader.email_reader.CHECKPOINT_INTERVAL", 1):
+            with self.assertRaises(OSError):
+                cli_main()
+
+        mock_save_checkpoint.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
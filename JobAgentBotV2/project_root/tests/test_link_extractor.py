@@ -1,75 +1,171 @@
-import sys
-import os
+import re
 import unittest
-
-# Add the project_root to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from modules.email_link_extractor.link_extractor import LinkExtractor
+from unittest.mock import patch
+from modules.email_link_extractor import link_extractor
+from modules.email_link_extractor.link_extractor import LinkExtractor, ANCHORS_WITH_HREF
 from bs4 import BeautifulSoup
 
+# (label, method, input, expected links) for the basic examples of each extraction method
+_EXTRACTION_CASES = (
+    ("text", LinkExtractor.extract_links_from_text,
+     "Visit https://example.com and also check http://test.org for more info.", ['https://example.com', 'http://test.org']),
+    ("text: no links", LinkExtractor.extract_links_from_text, "No links here!", []),
+    # '#' is not a link
+    ("html", LinkExtractor.extract_links_from_html, """
+        <html>
+            <body>
+                <a href="https://example.com">Example</a>
+                <a href="http://test.org">Test</a>
+                <a href="#">No link</a>
+            </body>
+        </html>
+        """, ['https://example.com', 'http://test.org']),
+    ("html: no links", LinkExtractor.extract_links_from_html, "<html><body><p>No links!</p></body></html>", []),
+    ("all links: plain text", LinkExtractor.extract_all_links, "Go to https://example.com for details.", ['https://example.com']),
+    ("all links: html", LinkExtractor.extract_all_links, '<a href="https://example.com">Example</a>', ['https://example.com']),
+)
+
 class TestLinkExtractor(unittest.TestCase):
 
-    def test_extract_links_from_text(self):
+    # Covers the basic cases of each method; see _EXTRACTION_CASES
+    def test_extraction_cases(self):
+        for label, extract, content, expected in _EXTRACTION_CASES:
+            with self.subTest(label=label):
+                self.assertEqual(extract(content), expected)
+
+    def test_extract_links_from_text_does_not_recompile(self):
         """
-        Test extracting links from plain text.
-        Ensures that valid URLs in plain text are correctly identified and returned.
+        Test that the URL pattern is compiled once at import, not on every call.
         """
-        text = "Visit https://example.com and also check http://test.org for more info."
-        expected_links = ['https://example.com', 'http://test.org']
-        self.assertEqual(LinkExtractor.extract_links_from_text(text), expected_links)
+        with patch("modules.email_link_extractor.link_extractor.re.compile", side_effect=AssertionError("recompiled")):
+            self.assertEqual(LinkExtractor.extract_links_from_text("See www.example.com"), ['www.example.com'])
 
-    def test_extract_links_from_html(self):
+    @unittest.skipUnless(link_extractor.re2, "google-re2 is not installed")
+    def test_extract_links_from_text_re2_matches_re(self):
+        """
+        Test that the RE2 and re URL patterns find the same links.
         """
-        Test extracting links from HTML content.
-        Ensures that valid URLs in anchor tags are correctly identified and returned.
+        text = 'Résumé: https://example.com/é?q=1, <https://a.org/x>"www.b.net/y" and http://' + "a" * 5000
+        self.assertEqual(link_extractor.URL_RE.findall(text), re.findall(link_extractor.URL_PATTERN, text))
+
+    @unittest.skipUnless(link_extractor.re2, "google-re2 is not installed")
+    def test_re2_stops_at_unicode_whitespace(self):
+        """
+        Test that with RE2, URLs end at non-ASCII whitespace such as NBSP, as they do with re.
+        """
+        text = "Apply at https://jobs.example.com/123\xa0today\u2003or www.b.net/y\u3000now\x85"
+        self.assertEqual(link_extractor.URL_RE.findall(text), re.findall(link_extractor.URL_PATTERN, text))
+        self.assertEqual(LinkExtractor.extract_links_from_text(text), ['https://jobs.example.com/123', 'www.b.net/y'])
+        html = '<a href="https://a.org/x">A</a> https://jobs.example.com/123\xa0today'
+        self.assertEqual(LinkExtractor.extract_all_links(html), ['https://a.org/x', 'https://jobs.example.com/123'])
+
+    def test_extract_all_links_single_pass(self):
+        """
+        Test that extract_all_links finds href values and written-out URLs in one pass,
+        in document order, without parsing the HTML or reporting a URL twice.
         """
         html = """
-        <html>
-            <body>
-                <a href="https://example.com">Example</a>
-                <a href="http://test.org">Test</a>
-                <a href="#">No link</a>
-            </body>
-        </html>
+        <html><body>
+            <a href="https://example.com/a?x=1&amp;y=2">A</a>
+            <a href="#">No link</a>
+            <p>Or visit www.test.org/b</p>
+            <a href='http://test.org/c'>http://test.org/c</a>
+        </body></html>
         """
-        # Update expected_links to exclude '#'
-        expected_links = ['https://example.com', 'http://test.org']
-        self.assertEqual(LinkExtractor.extract_links_from_html(html), expected_links)
+        expected = ['https://example.com/a?x=1&y=2', 'www.test.org/b', 'http://test.org/c']
+        with patch("modules.email_link_extractor.link_extractor.BeautifulSoup", side_effect=AssertionError("parsed HTML")):
+            self.assertEqual(LinkExtractor.extract_all_links(html), expected)
+            self.assertEqual(LinkExtractor.extract_all_links(html, is_html=True), expected)
 
-    def test_extract_all_links_plain_text(self):
+    def test_extract_links_deduplicated_in_order(self):
         """
-        Test extracting all links from plain text using the extract_all_links method.
-        Ensures that the method works correctly when is_html=False.
+        Test that repeated links are returned once, in order of first appearance.
         """
-        text = "Go to https://example.com for details."
-        expected = ['https://example.com']
-        self.assertEqual(LinkExtractor.extract_all_links(text, is_html=False), expected)
+        text = "https://b.com then https://a.com again https://b.com and https://a.com"
+        self.assertEqual(LinkExtractor.extract_links_from_text(text), ['https://b.com', 'https://a.com'])
+        html = '<a href="https://b.com">1</a><a href="https://a.com">2</a><a href="https://b.com">3</a>'
+        self.assertEqual(LinkExtractor.extract_links_from_html(html), ['https://b.com', 'https://a.com'])
 
-    def test_extract_all_links_html(self):
+    def test_extract_links_from_bytes_matches_text(self):
         """
-        Test extracting all links from HTML content using the extract_all_links method.
-        Ensures that the method works correctly when is_html=True.
+        Test that links found in a UTF-8 encoded body match those found in the decoded text.
         """
-        html = '<a href="https://example.com">Example</a>'
-        expected = ['https://example.com']
-        self.assertEqual(LinkExtractor.extract_all_links(html, is_html=True), expected)
+        text = "Résumé at https://example.com/é?q=1, www.test.org/b and https://example.com/é?q=1"
+        self.assertEqual(LinkExtractor.extract_links_from_bytes(text.encode("utf-8")),
+                         LinkExtractor.extract_links_from_text(text))
+        spaced = "https://jobs.example.com/123\xa0today\u2003or www.b.net/é\u3000now\x85 https://c.org/\u202fx\u1680"
+        self.assertEqual(LinkExtractor.extract_links_from_bytes(spaced.encode("utf-8")),
+                         ['https://jobs.example.com/123', 'www.b.net/é', 'https://c.org/'])
+        self.assertEqual(LinkExtractor.extract_links_from_bytes(spaced.encode("utf-8")),
+                         LinkExtractor.extract_links_from_text(spaced))
+        self.assertEqual(LinkExtractor.extract_links_from_bytes(b"No links here!"), [])
+        self.assertEqual(LinkExtractor.extract_links_from_bytes(b""), [])
 
-    def test_extract_links_from_text_with_no_links(self):
+    def test_extract_links_from_texts_matches_single(self):
         """
-        Test extracting links from plain text with no URLs.
-        Ensures that an empty list is returned when no links are present.
+        Test that extracting links from many texts at once gives each text's own links.
         """
-        text = "No links here!"
-        self.assertEqual(LinkExtractor.extract_links_from_text(text), [])
+        texts = [
+            "Visit https://example.com and http://test.org",
+            "",
+            "No links here!",
+            "ends with www.a.com",
+            "https://b.com\nhttps://b.com then www.a.com",
+        ]
+        self.assertEqual(LinkExtractor.extract_links_from_texts(texts),
+                         [LinkExtractor.extract_links_from_text(text) for text in texts])
+        self.assertEqual(LinkExtractor.extract_links_from_texts([]), [])
 
-    def test_extract_links_from_html_with_no_links(self):
+    def test_extract_links_from_text_skips_regex_without_candidates(self):
         """
-        Test extracting links from HTML content with no anchor tags containing href attributes.
-        Ensures that an empty list is returned when no links are present.
+        Test that text with neither "http" nor "www." is rejected without a regex scan.
+        """
+        with patch.object(link_extractor, "URL_RE") as mock_url_re:
+            self.assertEqual(LinkExtractor.extract_links_from_text("No links here!"), [])
+            mock_url_re.findall.assert_not_called()
+            LinkExtractor.extract_links_from_text("see www.example.com")
+            mock_url_re.findall.assert_called_once_with("see www.example.com")
+
+    def test_extract_links_from_html_only_builds_anchors(self):
+        """
+        Test that parsing HTML only builds <a href> elements into the tree.
+        Ensures that nested and unrelated markup does not affect the extracted links.
+        """
+        html = """
+        <html>
+            <head><title>https://not-a-link.example</title></head>
+            <body>
+                <div><p>Intro <a href="https://example.com/a">A</a></p></div>
+                <a name="anchor-without-href">Skipped</a>
+                <table><tr><td><a href="https://example.com/b">B</a></td></tr></table>
+            </body>
+        </html>
+        """
+        self.assertEqual(LinkExtractor.extract_links_from_html(html), ['https://example.com/a', 'https://example.com/b'])
+        soup = BeautifulSoup(html, "html.parser", parse_only=ANCHORS_WITH_HREF)
+        self.assertEqual({tag.name for tag in soup.find_all(True)}, {'a'})
+
+    @unittest.skipUnless(link_extractor.LexborHTMLParser and link_extractor.lxml, "selectolax or lxml is not installed")
+    def test_extract_links_from_html_matches_bs4_fallback(self):
+        """
+        Test that the selectolax, lxml and BeautifulSoup paths extract the same links.
+        """
+        html = """
+        <html><body>
+            <a href="https://example.com/a">A</a>
+            <a href="">Empty</a>
+            <a href>Bare</a>
+            <a href="mailto:someone@example.com">Mail</a>
+            <p><a href="http://test.org/b?x=1&amp;y=2">B</a></p>
+            <img src="https://example.com/pixel.png">
+        </body></html>
         """
-        html = "<html><body><p>No links!</p></body></html>"
-        self.assertEqual(LinkExtractor.extract_links_from_html(html), [])
+        links = LinkExtractor.extract_links_from_html(html)
+        with patch.object(link_extractor, "LexborHTMLParser", None):
+            self.assertEqual(LinkExtractor.extract_links_from_html(html), links)
+            with patch.object(link_extractor, "lxml", None):
+                self.assertEqual(LinkExtractor.extract_links_from_html(html), links)
+        self.assertEqual(links, ['https://example.com/a', 'http://test.org/b?x=1&y=2'])
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
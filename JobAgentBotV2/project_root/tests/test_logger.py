@@ -1,13 +1,5 @@
-import sys
 import os
 
-# Dynamically add the project root to sys.path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.abspath(os.path.join(current_dir, '..'))  # Move one level up
-sys.path.insert(0, project_root)
-
-#sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from core.utils.logger import setup_logger   # ✅ Corrected import!
 
 def test_setup_logger():
@@ -2,16 +2,18 @@ import unittest
 from core.utils.logger_config import get_logger
 
 class TestLoggerConfig(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up the logger once for all tests."""
-        self.logger = get_logger("testLoggerLevels")
+        cls.logger = get_logger("testLoggerLevels")
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Tear down the logger and close file handlers."""
-        handlers = self.logger.handlers[:]
+        handlers = cls.logger.handlers[:]
         for handler in handlers:
             handler.close()
-            self.logger.removeHandler(handler)
+            cls.logger.removeHandler(handler)
 
     def test_info_log(self):
         self.logger.info("This is an info log")
@@ -1,9 +1,61 @@
-from gtts import gTTS
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os
-from config import LANGUAGE, SLOW_MODE
+import re
+import shutil
+import tempfile
+from config import LANGUAGE, SLOW_MODE, MAX_WORKERS
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+# Generated audio, keyed by a hash of the text and speech settings
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
+os.makedirs(CACHE_DIR, exist_ok=True)  # Also creates OUTPUT_DIR
+
+def _cache_path(script_text):
+    key = hashlib.blake2b(f"{LANGUAGE}|{SLOW_MODE}|{script_text}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.mp3")
+
+# Whitespace after a sentence end; compiled once, not looked up in re's cache on every call
+SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+")
+
+def _split_sentences(script_text):
+    sentences = [sentence.strip() for sentence in SENTENCE_BREAK_RE.split(script_text)]
+    return [sentence for sentence in sentences if sentence] or [script_text]
+
+def _synthesize(sentence, part_path):
+    # Imported here: gtts pulls in requests, which importers of this module and cache hits never need
+    from gtts import gTTS
+    # Streamed to disk as it downloads, instead of holding the MP3 in memory
+    with open(part_path, "wb") as f:
+        gTTS(text=sentence, lang=LANGUAGE, slow=SLOW_MODE).write_to_fp(f)
+    return part_path
 
 def generate_audio(script_text, output_filename="output_audio.mp3"):
-    tts = gTTS(text=script_text, lang=LANGUAGE, slow=SLOW_MODE)
-    output_path = os.path.join(os.path.dirname(__file__), "output", output_filename)
-    tts.save(output_path)
-    print(f"Audio file saved at: {output_path}")
\ No newline at end of file
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+    cached_path = _cache_path(script_text)
+    if os.path.exists(cached_path):
+        print(f"Reusing cached audio for this script: {cached_path}")
+    else:
+        # Saved under a unique temporary name first, so a failed download never becomes a cache
+        # hit and concurrent runs of the same script never write to each other's files
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=CACHE_DIR)
+        sentences = _split_sentences(script_text)
+        part_paths = [f"{temp_path}.{i}" for i in range(len(sentences))]
+        try:
+            # Sentences are requested concurrently; MP3 frames can be joined without re-encoding
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                list(executor.map(_synthesize, sentences, part_paths))
+            with os.fdopen(fd, "wb") as f:
+                fd = None  # Closed by the with block from here on
+                for part_path in part_paths:
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, f)
+            os.replace(temp_path, cached_path)
+        finally:
+            if fd is not None:
+                os.close(fd)
+            for path in [temp_path, *part_paths]:
+                if os.path.exists(path):
+                    os.remove(path)
+    shutil.copyfile(cached_path, output_path)
+    print(f"Audio file saved at: {output_path}")
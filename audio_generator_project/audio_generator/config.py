@@ -4,4 +4,7 @@
 LANGUAGE = 'en'
 
 # Speed of the speech (False = Normal speed, True = Slow)
-SLOW_MODE = False
\ No newline at end of file
+SLOW_MODE = False
+
+# Number of sentences sent to Google TTS at the same time
+MAX_WORKERS = 8